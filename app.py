@@ -2,8 +2,11 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import os
+import logging
 from joblib import load  # use joblib for robust sklearn model loading
-from io import StringIO
+from io import BytesIO, StringIO
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
 
 # =========================================================
 # Page Configuration
@@ -43,27 +46,113 @@ LABELS = {
     "seasonal_spending_kmeans": "Seasonal Spending Patterns",
 }
 
-models = {}
-load_report = []
+# Optional native predictor for the LightGBM spending model (see compile_spending_model.py);
+# needs the optional lleaves package, without it the pickled model is used
+COMPILED_MODELS = {
+    "future_spending.pkl": ("future_spending.txt", "future_spending.so"),
+}
+
+
+def load_compiled_model(file_name):
+    """Return an lleaves predictor for `file_name`, or None if unavailable."""
+    if file_name not in COMPILED_MODELS:
+        return None
+    text_file, so_file = COMPILED_MODELS[file_name]
+    text_path = os.path.join(MODEL_DIR, text_file)
+    so_path = os.path.join(MODEL_DIR, so_file)
+    if not (os.path.exists(text_path) and os.path.exists(so_path)):
+        return None
+    try:
+        import lleaves
+    except ImportError:
+        return None
+    try:
+        compiled = lleaves.Model(model_file=text_path)
+        compiled.compile(cache=so_path)  # loads the cached .so, no recompilation
+        return compiled
+    except Exception:
+        # e.g. a corrupt or ABI-mismatched .so: say so, then fall back to the pickled model
+        logging.getLogger(__name__).exception("Could not load compiled predictor %s", so_path)
+        return None
+
+
+class LinearPredictor:
+    """`X @ coef + intercept` without sklearn's per-call input validation."""
+
+    def __init__(self, model):
+        self.name = type(model).__name__
+        self.coef = np.asarray(model.coef_, dtype=np.float32)
+        self.intercept = np.float32(model.intercept_)
+
+    def predict(self, X):
+        if X.shape[1] != self.coef.shape[-1]:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but {self.name} is expecting {self.coef.shape[-1]} features as input."
+            )
+        return X @ self.coef + self.intercept
+
+
+class NearestCentroidPredictor:
+    """KMeans assignment as a float32 argmin over squared distances to the centers."""
+
+    def __init__(self, model):
+        self.centers = np.asarray(model.cluster_centers_, dtype=np.float32)
+
+    def predict(self, X):
+        if X.shape[1] != self.centers.shape[1]:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but KMeans is expecting {self.centers.shape[1]} features as input."
+            )
+        return ((X[:, None, :] - self.centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+
+
+def fast_predictor(model):
+    """Swap single-row-friendly numpy predictors in for models with a closed-form predict."""
+    if isinstance(model, (LinearRegression, Ridge, Lasso)):
+        return LinearPredictor(model)
+    if isinstance(model, (KMeans, MiniBatchKMeans)):
+        return NearestCentroidPredictor(model)
+    return model
+
+
+@st.cache_resource
+def load_model_file(file_name):
+    """Load one .pkl once per process; keys sharing a file share the object."""
+    model_path = os.path.join(MODEL_DIR, file_name)
+    return fast_predictor(load_compiled_model(file_name) or load(model_path))  # use joblib.load for sklearn models
+
 
-for key, label in LABELS.items():
+@st.cache_resource
+def model_status():
+    """Process-wide load status per model key, filled in as models are first requested."""
+    return {}
+
+
+def get_model(key):
+    """Return the model behind `key`, loading it on first use; None if unavailable."""
+    status = model_status()
     file_name = ACTUAL_MODELS.get(key)
     model_path = os.path.join(MODEL_DIR, file_name) if file_name else ''
     if not model_path or not os.path.exists(model_path):
-        load_report.append((label, "⚠️ Error loading: FileNotFoundError"))
-        continue
+        status[key] = "⚠️ Error loading: FileNotFoundError"
+        return None
     try:
-        models[key] = load(model_path)  # use joblib.load for sklearn models
-        load_report.append((label, "✅ Loaded"))
+        model = load_model_file(file_name)
     except Exception as e:
-        load_report.append((label, f"⚠️ Error loading: {type(e).__name__}: {str(e)}"))
+        status[key] = f"⚠️ Error loading: {type(e).__name__}: {str(e)}"
+        return None
+    status[key] = "✅ Loaded"
+    return model
 
-# =========================================================
-# Sidebar - Model Load Status
-# =========================================================
-st.sidebar.header("🧩 Models Status")
-for model_name, status in load_report:
-    st.sidebar.write(f"**{model_name}** — {status}")
+
+# Placeholder inputs for models not yet wired to real features, keyed by width
+_DUMMY = {n: np.zeros((1, n), dtype=np.float32) for n in (4, 6, 9, 13)}
+
+
+@st.cache_data
+def predict_with_dummy(key, n_features):
+    """Predict on the constant placeholder input; deterministic, so safe to memoize."""
+    return get_model(key).predict(_DUMMY[n_features])[0]
 
 # =========================================================
 # User Financial Profile Input
@@ -87,6 +176,17 @@ with st.expander("Enter User Profile Details"):
 # =========================================================
 # Transaction Data Input
 # =========================================================
+@st.cache_data
+def parse_transactions(file_bytes: bytes) -> pd.DataFrame:
+    """Parse an uploaded statement; memoized on the file contents across reruns."""
+    return pd.read_csv(BytesIO(file_bytes), engine="pyarrow")
+
+
+@st.cache_data
+def parse_manual_transactions(text: str) -> pd.DataFrame:
+    return pd.read_csv(StringIO(text), names=["date", "category", "amount", "type"])
+
+
 st.header("📥 Transaction Data")
 upload_option = st.radio("Provide your transaction data:", ["Upload CSV", "Enter Manually"])
 transactions = None
@@ -94,7 +194,7 @@ transactions = None
 if upload_option == "Upload CSV":
     transaction_file = st.file_uploader("Upload your bank statement CSV", type=["csv"])
     if transaction_file:
-        transactions = pd.read_csv(transaction_file)
+        transactions = parse_transactions(transaction_file.getvalue())
         st.success(f"Loaded {len(transactions):,} transactions.")
         st.dataframe(transactions.head())
 else:
@@ -104,7 +204,7 @@ else:
     )
     if data.strip():
         try:
-            transactions = pd.read_csv(StringIO(data), names=["date", "category", "amount", "type"])
+            transactions = parse_manual_transactions(data)
             st.success(f"Parsed {len(transactions):,} transactions.")
             st.dataframe(transactions.head())
         except Exception as e:
@@ -116,15 +216,18 @@ else:
 st.header("💸 Future Spending Patterns")
 if st.button("Predict Next Month Spending"):
     required_models = ["spend_extra_trees", "spend_random_forest", "spend_linear"]
-    if not any(model in models for model in required_models):
+    # the spend_* keys can alias one loaded object; predict once per distinct model
+    loaded = [get_model(k) for k in required_models]
+    unique_models = {id(m): m for m in loaded if m is not None}.values()
+    if not unique_models:
         st.error("❌ No spending models loaded.")
     else:
         try:
-            features = np.array([[salary, monthly_expenses, salary - monthly_expenses, savings_balance, age, dependents]])
-            preds = []
-            for key in required_models:
-                if key in models:
-                    preds.append(models[key].predict(features)[0])
+            features = np.asarray(
+                [[salary, monthly_expenses, salary - monthly_expenses, savings_balance, age, dependents]],
+                dtype=np.float32,
+            )
+            preds = [m.predict(features)[0] for m in unique_models]
             if preds:
                 prediction = np.mean(preds)
                 st.success(f"💰 Predicted Next Month Spending: ₹{prediction:,.0f}")
@@ -136,10 +239,11 @@ if st.button("Predict Next Month Spending"):
 # =========================================================
 st.header("💧 Cash Flow & Liquidity")
 if st.button("Check Liquidity Health"):
-    if "cashflow_liquidity" in models:
+    model = get_model("cashflow_liquidity")
+    if model is not None:
         try:
-            features = np.array([[salary, monthly_expenses]])
-            value = models["cashflow_liquidity"].predict(features)[0]
+            features = np.asarray([[salary, monthly_expenses]], dtype=np.float32)
+            value = model.predict(features)[0]
             st.metric("Liquidity Index", f"{value:.2f}")
             if value > 0:
                 st.success("✅ Positive cashflow. Consider enhancing savings and investments.")
@@ -155,10 +259,9 @@ if st.button("Check Liquidity Health"):
 # =========================================================
 st.header("🎯 Life Event Detection")
 if st.button("Detect Life Events"):
-    if "lifeevent_classifier" in models:
+    if get_model("lifeevent_classifier") is not None:
         try:
-            dummy_features = np.random.rand(1, 9)  # Replace with real features if available
-            prediction = models["lifeevent_classifier"].predict(dummy_features)[0]
+            prediction = predict_with_dummy("lifeevent_classifier", 9)  # Replace with real features if available
             if prediction == 1:
                 st.success("🌟 Major life event likely ahead (e.g. marriage, relocation).")
             else:
@@ -173,10 +276,9 @@ if st.button("Detect Life Events"):
 # =========================================================
 st.header("📊 Investment Clustering")
 if st.button("Show Investment Cluster"):
-    if "investment_cluster_kmeans" in models:
+    if get_model("investment_cluster_kmeans") is not None:
         try:
-            dummy_features = np.random.rand(1, 6)  # Replace with real investment features
-            cluster_id = models["investment_cluster_kmeans"].predict(dummy_features)[0]
+            cluster_id = predict_with_dummy("investment_cluster_kmeans", 6)  # Replace with real investment features
             st.success(f"📈 You belong to Investment Cluster #{cluster_id + 1}")
         except Exception as e:
             st.error(f"Investment clustering error: {e}")
@@ -188,10 +290,9 @@ if st.button("Show Investment Cluster"):
 # =========================================================
 st.header("🔄 Subscription Churn Prediction")
 if st.button("Predict Subscription Churn"):
-    if "subscription_churn" in models:
+    if get_model("subscription_churn") is not None:
         try:
-            dummy_features = np.random.rand(1, 4)
-            churn_pred = models["subscription_churn"].predict(dummy_features)[0]
+            churn_pred = predict_with_dummy("subscription_churn", 4)
             st.warning("⚠️ At risk of subscription churn!" if churn_pred == 1 else "✅ Retention predicted.")
         except Exception as e:
             st.error(f"Churn model error: {e}")
@@ -203,16 +304,25 @@ if st.button("Predict Subscription Churn"):
 # =========================================================
 st.header("🌦️ Seasonal Spending Insights")
 if st.button("Analyze Seasonal Pattern"):
-    if "seasonal_spending_kmeans" in models:
+    if get_model("seasonal_spending_kmeans") is not None:
         try:
-            dummy_features = np.random.rand(1, 13)
-            cluster = models["seasonal_spending_kmeans"].predict(dummy_features)[0]
+            cluster = predict_with_dummy("seasonal_spending_kmeans", 13)
             st.info(f"🗓️ Seasonal Cluster #{cluster + 1} — aligns with festival and holiday spending trends.")
         except Exception as e:
             st.error(f"Seasonal spending model error: {e}")
     else:
         st.warning("Seasonal spending model not loaded.")
 
+# =========================================================
+# Sidebar - Model Load Status
+# =========================================================
+# Rendered last so it reflects models loaded by this run's button clicks
+st.sidebar.header("🧩 Models Status")
+status = model_status()
+st.sidebar.markdown("\n".join(
+    f"- **{label}** — {status.get(key, '⏳ Not loaded yet')}" for key, label in LABELS.items()
+))
+
 # =========================================================
 # Footer
 # =========================================================
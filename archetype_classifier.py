@@ -1,30 +1,24 @@
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.preprocessing import LabelEncoder
 import joblib
+from data_cache import ARCHETYPES, load_users
+from model_io import MODEL_COMPRESS
 
 def train():
-    df = pd.read_csv("users_profile_full_v3.csv")
+    df = load_users()
 
-    archetypes = {
-        "conservative_saver": 0,
-        "balanced_planner": 1,
-        "aggressive_investor": 2,
-        "impulsive_spender": 3,
-        "goal_oriented_optimizer": 4
-    }
-    df['user_archetype_code'] = df['user_archetype'].map(archetypes)
-
-    df = df.dropna(subset=['user_archetype_code'])
-    df['user_archetype_code'] = df['user_archetype_code'].astype(int)
+    archetypes = {name: code for code, name in enumerate(ARCHETYPES)}
+    # user_archetype is read with ARCHETYPES as its categories, so codes are the labels
+    df['user_archetype_code'] = df['user_archetype'].cat.codes
+    df = df[df['user_archetype_code'] >= 0]
 
     X = df.drop(columns=['user_id', 'user_archetype', 'user_archetype_code'])
     y = df['user_archetype_code']
 
-    for col in X.select_dtypes(include=['object']).columns:
-        X[col] = X[col].astype('category').cat.codes
+    obj_cols = X.select_dtypes(include=['object', 'category']).columns
+    X[obj_cols] = X[obj_cols].apply(lambda c: c.astype('category').cat.codes)
 
     X.fillna(-1, inplace=True)
 
@@ -42,7 +36,7 @@ def train():
     print("Confusion Matrix:")
     print(confusion_matrix(y_test, preds))
 
-    joblib.dump(model, "models/archetype_classifier.pkl")
+    joblib.dump(model, "models/archetype_classifier.pkl", compress=MODEL_COMPRESS)
     joblib.dump(archetypes, "models/archetype_label_mapping.pkl")
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 # base_model.py
 import joblib
 import os
+import numpy as np
 from abc import ABC, abstractmethod
 
 class BaseFinancialModel(ABC):
@@ -17,6 +18,10 @@ class BaseFinancialModel(ABC):
     def predict(self, X):
         raise NotImplementedError
 
+    def predict_batch(self, X_batch) -> np.ndarray:
+        """Score many rows in one call; subclasses may override with a native batch path."""
+        return np.asarray(self.predict(np.ascontiguousarray(X_batch, dtype=np.float32)))
+
     @abstractmethod
     def evaluate(self, X_test, y_test):
         raise NotImplementedError
@@ -1,16 +1,16 @@
-import pandas as pd
 from sklearn.linear_model import Ridge
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 from math import sqrt
 from joblib import dump
+from data_cache import encode_categoricals, load_master_features
+from model_io import MODEL_COMPRESS
 
-df = pd.read_csv("finbuddy_master_features.csv", index_col=0)
+df = load_master_features(exclude=['user_archetype'])
 X = df.drop(columns=['cashflow_surplus_mean', 'user_archetype'], errors='ignore')
 y = df['cashflow_surplus_mean']
 
-for col in X.select_dtypes(include=['object']).columns:
-    X[col] = X[col].astype('category').cat.codes
+X = encode_categoricals(X)
 
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42)
@@ -22,4 +22,4 @@ preds = model.predict(X_test)
 mse = mean_squared_error(y_test, preds)
 rmse = sqrt(mse)
 print(f"Cashflow & Liquidity RMSE: {rmse:.4f}")
-dump(model, "models/cashflow_liquidity.pkl")
+dump(model, "models/cashflow_liquidity.pkl", compress=MODEL_COMPRESS)
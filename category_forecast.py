@@ -1,37 +1,39 @@
-import pandas as pd
 from lightgbm import LGBMRegressor
 from sklearn.model_selection import train_test_split
+from sklearn.multioutput import MultiOutputRegressor
 from sklearn.metrics import mean_squared_error
 from math import sqrt
 import joblib
+from data_cache import encode_categoricals, load_master_features
+from model_io import MODEL_COMPRESS
 
 def train():
-    df = pd.read_csv("finbuddy_master_features.csv", index_col=0)
+    df = load_master_features(exclude=['user_archetype'])
     expense_cols = ['food_expense','groceries_expense','education_expense','subscriptions_expense',
                     'fuel_expense','transportation_expense','utilities_expense','entertainment_expense',
                     'shopping_expense','healthcare_expense','personal_care_expense','miscellaneous_expense']
 
     X = df.drop(columns=expense_cols + ['user_archetype'], errors='ignore')
 
-    for cat in expense_cols:
-        y = df[cat]
-        if y.nunique() < 2:
-            continue
+    # encode once; every target shares the same feature matrix
+    X = encode_categoricals(X)
 
-        X_cat = X.copy()
-        for col in X_cat.select_dtypes(include=['object']).columns:
-            X_cat[col] = X_cat[col].astype('category').cat.codes
+    targets = [cat for cat in expense_cols if df[cat].nunique() >= 2]
+    Y = df[targets].to_numpy()
 
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_cat, y, test_size=0.2, random_state=42)
+    X_train, X_test, Y_train, Y_test = train_test_split(
+        X, Y, test_size=0.2, random_state=42)
 
-        model = LGBMRegressor()
-        model.fit(X_train, y_train)
-        preds = model.predict(X_test)
-        mse = mean_squared_error(y_test, preds)
+    # one fit call over a shared split; targets train one after another, each booster
+    # multi-threaded (no nested process pool under orchestrate_train_all.py)
+    model = MultiOutputRegressor(LGBMRegressor())
+    model.fit(X_train, Y_train)
+    preds = model.predict(X_test)
+    for i, cat in enumerate(targets):
+        mse = mean_squared_error(Y_test[:, i], preds[:, i])
         rmse = sqrt(mse)
         print(f"Category Forecast {cat} RMSE: {rmse:.4f}")
-        joblib.dump(model, f"models/category_forecast_{cat}.pkl")
+        joblib.dump(model.estimators_[i], f"models/category_forecast_{cat}.pkl", compress=MODEL_COMPRESS)
 
 if __name__ == "__main__":
     train()
@@ -0,0 +1,35 @@
+"""
+compile_spending_model.py
+
+Compiles the LightGBM future-spending model to a native shared object with
+lleaves, so app.py can skip LightGBM's Python predict path for single rows.
+
+Inputs:
+  - models/future_spending.pkl
+Outputs:
+  - models/future_spending.txt  (LightGBM text dump consumed by lleaves)
+  - models/future_spending.so   (compiled predictor, loaded by app.py)
+
+Requires the optional lleaves package (`pip install lleaves`), which is not in
+requirements.txt; without it (or the outputs above) app.py loads the pickled model.
+"""
+
+import os
+import joblib
+import lleaves
+
+MODEL_DIR = "models"
+MODEL_FILE = os.path.join(MODEL_DIR, "future_spending.pkl")
+TEXT_FILE = os.path.join(MODEL_DIR, "future_spending.txt")
+COMPILED_FILE = os.path.join(MODEL_DIR, "future_spending.so")
+
+def compile_model():
+    model = joblib.load(MODEL_FILE)
+    model.booster_.save_model(TEXT_FILE)
+
+    compiled = lleaves.Model(model_file=TEXT_FILE)
+    compiled.compile(cache=COMPILED_FILE)
+    print(f"[SAVED] {COMPILED_FILE}")
+
+if __name__ == "__main__":
+    compile_model()
@@ -1,11 +1,11 @@
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime
+from data_cache import load_users
 
-# ✅ Correct demographics dataset filename
-USER_PROFILE_FILE = "users_profile_full_v3.csv"
-OUTPUT_FILE = "credit_loans_12m.csv"
+OUTPUT_FILE = "credit_loans_12m.parquet"
+CSV_OUTPUT_FILE = "credit_loans_12m.csv"
+WRITE_CSV = True  # mysql_bulk_loader_fixed.py loads this table via LOAD DATA, which needs CSV
+SEED = 42
 
 # Date range for 12 months
 START_YEAR = 2024
@@ -20,84 +20,88 @@ def generate_month_dates():
         dates.append(f"{year}-{month:02d}")
     return dates
 
-def credit_limit_from_income(income):
-    return round(random.uniform(2.5, 4.5) * income, 2)
+def yes_no_mask(series):
+    return series.astype(str).str.strip().str.lower().isin(["yes", "true", "1"]).to_numpy()
 
-def generate_loan_amount(income, risk_tolerance, age):
-    if risk_tolerance == "Low" or age < 22:
-        return random.choice([0, 0, 0, round(income * random.uniform(3, 6), 2)])
-    elif risk_tolerance == "Medium":
-        return round(income * random.uniform(4, 10), 2)
-    else:  # High risk users borrow more
-        return round(income * random.uniform(8, 15), 2)
+def credit_limit_from_income(rng, income):
+    return np.round(rng.uniform(2.5, 4.5, income.shape) * income, 2)
+
+def generate_loan_amount(rng, income, risk_tolerance, age):
+    """Loan amounts for every (user, month); income/risk/age are per-user (N,) arrays."""
+    shape = (len(income), MONTHS)
+    income = income[:, None]
+    low = ((risk_tolerance == "Low") | (age < 22))[:, None]
+    medium = (risk_tolerance == "Medium")[:, None]
+
+    # Low risk / very young: 1-in-4 chance of a small loan, else none
+    low_amount = np.where(rng.integers(0, 4, shape) == 3, np.round(income * rng.uniform(3, 6, shape), 2), 0.0)
+    medium_amount = np.round(income * rng.uniform(4, 10, shape), 2)
+    high_amount = np.round(income * rng.uniform(8, 15, shape), 2)  # High risk users borrow more
+    return np.where(low, low_amount, np.where(medium, medium_amount, high_amount))
 
 def create_credit_loan_dataset():
-    df_users = pd.read_csv(USER_PROFILE_FILE)
+    df_users = load_users()
+    rng = np.random.default_rng(SEED)
 
-    months = generate_month_dates()
-    rows = []
+    months = np.array(generate_month_dates(), dtype="U7")
+    n_users = len(df_users)
 
     print("\n==========================================================")
     print(" Generating Credit & Loan Dataset (12 Months per User)")
     print("==========================================================\n")
 
-    for idx, row in df_users.iterrows():
-        user_id = row["user_id"]
-        monthly_income = row["monthly_income"]
-        risk = row["risk_tolerance"]
-        age = row["age"]
-        is_student = row["is_student"]
-        is_metro = row["is_metro"]
-
-        # Base probabilities influenced by demographics
-        has_credit_card = (
-            random.random() < 0.90 if is_metro else random.random() < 0.70
-        )
-        has_loan = (
-            random.random() < 0.50 if age > 24 else random.random() < 0.20
+    monthly_income = df_users["monthly_income"].to_numpy(dtype=float)
+    risk = df_users["risk_tolerance"].to_numpy()
+    age = df_users["age"].to_numpy()
+    is_student = yes_no_mask(df_users["is_student"])
+    is_metro = yes_no_mask(df_users["is_metro"])
+
+    # Base probabilities influenced by demographics
+    has_credit_card = rng.random(n_users) < np.where(is_metro, 0.90, 0.70)
+    has_loan = rng.random(n_users) < np.where(age > 24, 0.50, 0.20)
+
+    credit_limit = np.where(has_credit_card, credit_limit_from_income(rng, monthly_income), 0.0)
+    student_credit_boost = np.where(is_student, 1.1, 1.0)
+    credit_limit = np.round(credit_limit * student_credit_boost, 2)
+
+    outstanding_credit = np.where(
+        has_credit_card[:, None],
+        np.round(rng.uniform(0.05, 0.85, (n_users, MONTHS)) * credit_limit[:, None], 2),
+        0.0
+    )
+    loan_amount = np.where(has_loan[:, None], generate_loan_amount(rng, monthly_income, risk, age), 0.0)
+    loan_balance = np.where(
+        has_loan[:, None],
+        np.round(np.maximum(loan_amount - rng.uniform(0.02, 0.08, (n_users, MONTHS)) * loan_amount, 0), 2),
+        0.0
+    )
+
+    has_limit = (has_credit_card & (credit_limit > 0))[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        credit_utilization = np.where(has_limit, np.round(outstanding_credit / credit_limit[:, None], 2), 0.0)
+        loan_to_income_ratio = np.where(
+            loan_balance > 0, np.round(loan_balance / monthly_income[:, None], 2), 0.0
         )
 
-        credit_limit = credit_limit_from_income(monthly_income) if has_credit_card else 0
-        student_credit_boost = 1.1 if is_student else 1.0
-        credit_limit = round(credit_limit * student_credit_boost, 2)
-
-        for month in months:
-            outstanding_credit = (
-                round(random.uniform(0.05, 0.85) * credit_limit, 2)
-                if has_credit_card else 0
-            )
-            loan_amount = generate_loan_amount(monthly_income, risk, age) if has_loan else 0
-            loan_balance = (
-                round(max(loan_amount - random.uniform(0.02, 0.08) * loan_amount, 0), 2)
-                if has_loan else 0
-            )
-
-            rows.append({
-                "user_id": user_id,
-                "month": month,
-                "has_credit_card": int(has_credit_card),
-                "credit_limit": credit_limit,
-                "outstanding_credit": outstanding_credit,
-                "credit_utilization": round(
-                    outstanding_credit / credit_limit, 2
-                ) if has_credit_card and credit_limit > 0 else 0,
-                "has_loan": int(has_loan),
-                "loan_amount": loan_amount,
-                "loan_balance": loan_balance,
-                "loan_to_income_ratio": round(
-                    loan_balance / monthly_income, 2
-                ) if loan_balance > 0 else 0
-            })
-
-        if (idx + 1) % 500 == 0:
-            print(f"Processed users: {idx+1}/{len(df_users)}")
-
-    df_output = pd.DataFrame(rows)
-    df_output.to_csv(OUTPUT_FILE, index=False)
+    df_output = pd.DataFrame({
+        "user_id": np.repeat(df_users["user_id"].to_numpy(), MONTHS),
+        "month": np.tile(months, n_users),
+        "has_credit_card": np.repeat(has_credit_card.astype(int), MONTHS),
+        "credit_limit": np.repeat(credit_limit, MONTHS),
+        "outstanding_credit": outstanding_credit.ravel(),
+        "credit_utilization": credit_utilization.ravel(),
+        "has_loan": np.repeat(has_loan.astype(int), MONTHS),
+        "loan_amount": loan_amount.ravel(),
+        "loan_balance": loan_balance.ravel(),
+        "loan_to_income_ratio": loan_to_income_ratio.ravel(),
+    })
+    df_output.to_parquet(OUTPUT_FILE, engine="pyarrow", compression="snappy", index=False)
+    if WRITE_CSV:
+        df_output.to_csv(CSV_OUTPUT_FILE, index=False)
 
     print("\n✅ Generation Complete!")
-    print(f"Total users: {len(df_users)}")
-    print(f"Total rows created: {len(rows)}")
+    print(f"Total users: {n_users}")
+    print(f"Total rows created: {len(df_output)}")
     print(f"Output file: {OUTPUT_FILE}")
 
 if __name__ == "__main__":
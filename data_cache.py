@@ -0,0 +1,88 @@
+# data_cache.py
+# Disk-memoized loaders for the datasets several scripts read, so one pipeline
+# run parses each CSV once. Entries are keyed on the file's mtime, so a
+# regenerated CSV is picked up automatically.
+import os
+import pandas as pd
+import pyarrow.parquet as pq
+from joblib import Memory
+
+USER_PROFILE_FILE = "users_profile_full_v3.csv"
+MASTER_FEATURES_FILE = "finbuddy_master_features.parquet"
+
+CACHE_DIR = os.environ.get("FINBUDDY_CACHE_DIR", ".cache")
+CACHE_SIZE_LIMIT = os.environ.get("FINBUDDY_CACHE_SIZE_LIMIT")  # e.g. "2G"; unset = unbounded
+
+memory = Memory(CACHE_DIR, verbose=0)
+if CACHE_SIZE_LIMIT:
+    memory.reduce_size(bytes_limit=CACHE_SIZE_LIMIT)
+
+# Fixed schema of users_profile_full_v3.csv (see users_profile_full.py); pinning
+# dtypes skips type inference and keeps the frame compact.
+ARCHETYPES = [
+    "conservative_saver",
+    "balanced_planner",
+    "aggressive_investor",
+    "impulsive_spender",
+    "goal_oriented_optimizer"
+]
+EXPENSE_COLUMNS = [
+    "food_expense", "groceries_expense", "education_expense", "subscriptions_expense",
+    "fuel_expense", "transportation_expense", "utilities_expense", "entertainment_expense",
+    "shopping_expense", "healthcare_expense", "personal_care_expense", "miscellaneous_expense"
+]
+USERS_SCHEMA = {
+    "user_id": "int32",
+    "age": "int16",
+    "month": "float32",  # always empty in the generated file
+    "monthly_income": "int32",
+    "education": "category",
+    "city": "category",
+    "is_metro": "bool",
+    "dependents": "int8",
+    "years_experience": "int16",
+    "is_student": "bool",
+    "risk_tolerance": "float32",
+    "monthly_expenses": "int32",
+    **{c: "int32" for c in EXPENSE_COLUMNS},
+    "monthly_surplus": "int32",
+    "savings_rate": "float32",
+    "investment_amount": "int32",
+    "has_investments": "bool",
+    "technology_comfort": "float32",
+    "money_management_approach": "category",
+    "decision_making_style": "category",
+    "goal_setting_behavior": "category",
+    "preferred_communication": "category",
+    "information_processing": "category",
+    "user_archetype": pd.CategoricalDtype(ARCHETYPES),  # codes follow ARCHETYPES order
+    "debt_to_income": "float32",
+}
+
+@memory.cache
+def _read_csv(path, mtime, **kwargs):
+    return pd.read_csv(path, **kwargs)
+
+def load_csv(path, **kwargs):
+    return _read_csv(path, os.path.getmtime(path), **kwargs)
+
+def load_users():
+    return load_csv(
+        USER_PROFILE_FILE, dtype=USERS_SCHEMA, engine="pyarrow",
+        true_values=["Yes"], false_values=["No"]
+    )
+
+def load_master_features(columns=None, exclude=()):
+    # Parquet is columnar: passing `columns` (or `exclude`) reads only the needed column chunks
+    if exclude:
+        names = columns or pq.read_schema(MASTER_FEATURES_FILE).names
+        columns = [c for c in names if c not in exclude]
+    return pd.read_parquet(MASTER_FEATURES_FILE, columns=columns)
+
+def encode_categoricals(X):
+    # Category columns become their integer codes in one pass; master features
+    # are stored with their categories, so codes match between scripts and runs
+    cat_cols = X.select_dtypes(include=['category']).columns
+    if len(cat_cols):
+        X[cat_cols] = X[cat_cols].apply(lambda c: c.cat.codes)
+    return X
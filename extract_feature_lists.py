@@ -1,5 +1,6 @@
 import os
 import joblib
+from joblib import Parallel, delayed
 
 MODEL_DIR = "models"
 
@@ -13,13 +14,13 @@ model_files = {
     "seasonal_spending.pkl": "seasonal_spending_features.pkl"
 }
 
-for model_file, feature_file in model_files.items():
+def extract(model_file, feature_file):
     model_path = os.path.join(MODEL_DIR, model_file)
     feature_path = os.path.join(MODEL_DIR, feature_file)
 
     if not os.path.exists(model_path):
         print(f"Model file {model_file} not found. Skipping.")
-        continue
+        return
 
     try:
         model = joblib.load(model_path)
@@ -32,10 +33,16 @@ for model_file, feature_file in model_files.items():
         else:
             # As fallback, ask user to provide manually or skip
             print(f"Model {model_file} missing feature names attribute, skipping.")
-            continue
+            return
 
         joblib.dump(feature_cols, feature_path)
         print(f"Extracted and saved feature list for {model_file} to {feature_file}")
 
     except Exception as e:
         print(f"Failed to load or process {model_file}: {type(e).__name__}: {e}")
+
+if __name__ == "__main__":
+    # each model loads in its own worker; unpickling large forests is the bottleneck
+    Parallel(n_jobs=-1, backend="loky")(
+        delayed(extract)(mf, ff) for mf, ff in model_files.items()
+    )
@@ -14,14 +14,12 @@ Uses user profile file (auto-detect):
 """
 
 import os
-import random
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 
 SEED = 42
-random.seed(SEED)
-np.random.seed(SEED)
+rng = np.random.default_rng(SEED)
 
 POSSIBLE_USER_FILES = [
     "users_profile_full_v3.csv",
@@ -60,6 +58,55 @@ DEFAULT_PRIORITY = {
 
 RISK_BUCKETS = ["Low", "Medium", "High"]
 
+class WeightedChoice:
+    """Weighted draws from a fixed set of values; the CDF is built once and reused."""
+
+    def __init__(self, values, weights):
+        self.values = np.asarray(values)
+        self.cdf = np.cumsum(weights) / np.sum(weights)
+        self.cdf[-1] = 1.0  # guard against float round-off leaving the last bucket unreachable
+
+    def sample(self, size):
+        return self.values[np.searchsorted(self.cdf, rng.random(size), side="right")]
+
+# Number of goals per user (1-4)
+GOAL_COUNT_CHOICE = WeightedChoice([1, 2, 3, 4], [0.2, 0.45, 0.25, 0.10])
+
+# Integer codes used by the vectorized generator (index into GOAL_TYPES)
+GOAL_CODE = {g: i for i, g in enumerate(GOAL_TYPES)}
+GOAL_TYPES_ARR = np.array(GOAL_TYPES)
+PRIORITY_BY_CODE = np.array([DEFAULT_PRIORITY[g] for g in GOAL_TYPES])
+
+EMERGENCY = GOAL_CODE["Emergency Fund"]
+TRAVEL = GOAL_CODE["Travel"]
+EDUCATION = GOAL_CODE["Education"]
+LAPTOP = GOAL_CODE["Laptop/Mobile Upgrade"]
+BIKE = GOAL_CODE["Vehicle (Bike)"]
+CAR = GOAL_CODE["Vehicle (Car)"]
+HOME = GOAL_CODE["Home Down Payment"]
+MARRIAGE = GOAL_CODE["Marriage"]
+RETIREMENT = GOAL_CODE["Retirement"]
+BUSINESS = GOAL_CODE["Business Startup"]
+HEALTH = GOAL_CODE["Health/Insurance Fund"]
+LUXURY = GOAL_CODE["Luxury Purchase"]
+INVESTMENT = GOAL_CODE["Investment Wealth Goal"]
+
+# Candidate horizons in years per goal; Retirement is derived from age instead
+HORIZON_OPTIONS = {
+    EMERGENCY: [1, 1, 2],  # short-term
+    TRAVEL: [0.5, 1, 2],
+    EDUCATION: [1, 2, 3],
+    LAPTOP: [0.25, 0.5, 1],
+    BIKE: [1, 2, 3],
+    CAR: [1, 2, 3],
+    HOME: [3, 5, 7],
+    MARRIAGE: [1, 2, 3],
+    BUSINESS: [1, 2, 3, 4],
+    HEALTH: [1, 2],
+    LUXURY: [0.5, 1, 2],
+    INVESTMENT: [3, 5, 7, 10],
+}
+
 # Helpful helpers
 def find_user_file():
     for f in POSSIBLE_USER_FILES:
@@ -67,145 +114,142 @@ def find_user_file():
             return f
     raise FileNotFoundError("No user profile file found. Looked for: " + ", ".join(POSSIBLE_USER_FILES))
 
-def safe_get(row, key, default=None):
-    return row.get(key) if key in row else default
-
-def years_to_target_by_goal(goal_type, age, archetype):
-    # Rough default horizon in years
-    if goal_type == "Emergency Fund":
-        return random.choice([1, 1, 2])  # short-term
-    if goal_type == "Travel":
-        return random.choice([0.5, 1, 2])
-    if goal_type == "Education":
-        return random.choice([1, 2, 3])
-    if goal_type == "Laptop/Mobile Upgrade":
-        return random.choice([0.25, 0.5, 1])
-    if goal_type.startswith("Vehicle"):
-        return random.choice([1, 2, 3])
-    if goal_type == "Home Down Payment":
-        return random.choice([3, 5, 7])
-    if goal_type == "Marriage":
-        return random.choice([1, 2, 3])
-    if goal_type == "Retirement":
-        # use age to determine horizon
-        retire_age = 60
-        yrs = max(5, (retire_age - (age or 30)))
-        return max(5, int(min(40, yrs)))
-    if goal_type == "Business Startup":
-        return random.choice([1, 2, 3, 4])
-    if goal_type == "Health/Insurance Fund":
-        return random.choice([1, 2])
-    if goal_type == "Luxury Purchase":
-        return random.choice([0.5, 1, 2])
-    if goal_type == "Investment Wealth Goal":
-        return random.choice([3, 5, 7, 10])
-    return 2
-
-def estimate_target_amount(goal_type, monthly_income, monthly_expenses, age):
-    # Base heuristics using income and expenses
-    income = max(1.0, float(monthly_income or 0.0))
-    expenses = max(0.0, float(monthly_expenses or income * 0.6))
-    if goal_type == "Emergency Fund":
-        # aim 3-6 months of expenses
-        months = random.choice([3, 4, 6])
-        return round(expenses * months, 2)
-    if goal_type == "Travel":
-        return round(income * random.uniform(2, 6), 2)
-    if goal_type == "Education":
-        # if younger -> smaller (course), if older -> higher (higher studies)
-        factor = random.uniform(6, 24) if age and age < 30 else random.uniform(12, 36)
-        return round(income * factor, 2)
-    if goal_type == "Laptop/Mobile Upgrade":
-        return round(random.choice([40000, 70000, 120000]) * (1 if income>0 else 1), 2)
-    if goal_type == "Vehicle (Bike)":
-        return round(random.uniform(40000, 150000), 2)
-    if goal_type == "Vehicle (Car)":
-        return round(random.uniform(400000, 2000000), 2)
-    if goal_type == "Home Down Payment":
-        # assume 20% down of an avg house price (varies by income)
-        avg_house_price = max(2000000, income * 50 * 12)  # rough proxy
-        return round(avg_house_price * random.uniform(0.15, 0.30), 2)
-    if goal_type == "Marriage":
-        return round(income * random.uniform(24, 120), 2)
-    if goal_type == "Retirement":
-        # want replacement of annual income * 20-30
-        annual = income * 12
-        return round(annual * random.uniform(15, 30), 2)
-    if goal_type == "Business Startup":
-        return round(income * random.uniform(24, 120), 2)
-    if goal_type == "Health/Insurance Fund":
-        return round(income * random.uniform(6, 24), 2)
-    if goal_type == "Luxury Purchase":
-        return round(income * random.uniform(6, 36), 2)
-    if goal_type == "Investment Wealth Goal":
-        return round(income * random.uniform(60, 300), 2)
-    return round(income * 12, 2)
-
-def choose_risk_by_goal(goal_type, archetype):
+def pick_from(options, u):
+    """Uniform pick from `options` for each row, given one uniform [0, 1) draw per row."""
+    options = np.asarray(options)
+    return options[np.minimum((u * len(options)).astype(int), len(options) - 1)]
+
+def years_to_target_by_goal(goal_code, age):
+    # Rough default horizon in years, one entry per goal. Each goal takes a
+    # single branch, so all branches can share one draw per goal.
+    u = rng.random(len(goal_code))
+    years = np.full(len(goal_code), 2.0)
+    for code, options in HORIZON_OPTIONS.items():
+        mask = goal_code == code
+        years[mask] = pick_from(options, u[mask])
+    # Retirement: use age to determine horizon
+    retire_age = 60
+    retirement = goal_code == RETIREMENT
+    years[retirement] = np.clip(retire_age - age[retirement], 5, 40)
+    return years
+
+def estimate_target_amount(goal_code, monthly_income, monthly_expenses, age):
+    # Base heuristics using income and expenses, one entry per goal
+    n = len(goal_code)
+    income = np.maximum(1.0, monthly_income)
+    expenses = np.maximum(0.0, np.where(monthly_expenses > 0, monthly_expenses, income * 0.6))
+    u = rng.random(n)
+    emergency_months = pick_from([3, 4, 6], u)  # aim 3-6 months of expenses
+    laptop_price = pick_from([40000.0, 70000.0, 120000.0], u)
+
+    def uniform(lo, hi):
+        return lo + (hi - lo) * u
+
+    # assume 20% down of an avg house price (varies by income)
+    avg_house_price = np.maximum(2000000, income * 50 * 12)  # rough proxy
+    target = np.select(
+        [
+            goal_code == EMERGENCY,
+            goal_code == TRAVEL,
+            goal_code == EDUCATION,
+            goal_code == LAPTOP,
+            goal_code == BIKE,
+            goal_code == CAR,
+            goal_code == HOME,
+            goal_code == MARRIAGE,
+            goal_code == RETIREMENT,
+            goal_code == BUSINESS,
+            goal_code == HEALTH,
+            goal_code == LUXURY,
+            goal_code == INVESTMENT,
+        ],
+        [
+            expenses * emergency_months,
+            income * uniform(2, 6),
+            # if younger -> smaller (course), if older -> higher (higher studies)
+            income * np.where(age < 30, uniform(6, 24), uniform(12, 36)),
+            laptop_price,
+            uniform(40000, 150000),
+            uniform(400000, 2000000),
+            avg_house_price * uniform(0.15, 0.30),
+            income * uniform(24, 120),
+            income * 12 * uniform(15, 30),  # replacement of annual income * 15-30
+            income * uniform(24, 120),
+            income * uniform(6, 24),
+            income * uniform(6, 36),
+            income * uniform(60, 300),
+        ],
+        default=income * 12
+    )
+    return np.round(target, 2)
+
+def choose_risk_by_goal(goal_code, is_impulsive):
     # Simple mapping: emergency very low risk, business high risk, investment wealth high
-    if goal_type in ["Emergency Fund", "Health/Insurance Fund"]:
-        return "Low"
-    if goal_type in ["Business Startup", "Investment Wealth Goal"]:
-        return "High"
-    if archetype and "impulsive" in archetype.lower():
-        return random.choice(["Medium", "High"])
-    return random.choice(["Low", "Medium"])
+    u = rng.random(len(goal_code))
+    return np.select(
+        [
+            (goal_code == EMERGENCY) | (goal_code == HEALTH),
+            (goal_code == BUSINESS) | (goal_code == INVESTMENT),
+            is_impulsive,
+        ],
+        [
+            "Low",
+            "High",
+            pick_from(["Medium", "High"], u),
+        ],
+        default=pick_from(["Low", "Medium"], u)
+    )
 
 def months_to_target(years):
-    return max(1, int(round(years * 12)))
+    return np.maximum(1, np.round(years * 12)).astype(int)
 
 def generate_goal_id(seq):
-    return f"G-{seq:08d}"
+    return "G-" + pd.Series(seq).astype(str).str.zfill(8)
 
 def clamp_priority(p):
-    return max(1, min(10, int(round(p))))
-
-def pick_goal_types_for_user(age, archetype, is_student, income, existing_goals_count):
-    # pick 1-4 goals, prefer some based on demographics
-    n = random.choices([1,2,3,4], weights=[0.2,0.45,0.25,0.10])[0]
+    return np.clip(np.round(p), 1, 10).astype(int)
+
+def pick_goal_types_for_user(age, is_student, income, is_impulsive, is_planner, is_investor):
+    """
+    Pick 1-4 goals per user, preferring some based on demographics.
+    Returns (user_index, goal_code) arrays with one entry per picked goal.
+    """
+    n_users = len(age)
+    n_types = len(GOAL_TYPES)
+    n = GOAL_COUNT_CHOICE.sample(n_users)
     # ensure not too many for low-income users
-    if income is None or income <= 0:
-        n = min(n, 2)
-    # priority picks
-    candidates = GOAL_TYPES.copy()
-    picks = set()
+    n = np.where(income <= 0, np.minimum(n, 2), n)
+
+    picks = np.zeros((n_users, n_types), dtype=bool)
+    gates = rng.random((n_users, 5))
 
     # always include emergency fund with some probability
-    if random.random() < 0.85:
-        picks.add("Emergency Fund")
+    picks[:, EMERGENCY] |= gates[:, 0] < 0.85
 
     # students: education, laptop/mobile, travel
-    if is_student:
-        picks.add("Education")
-        if random.random() < 0.6:
-            picks.add("Laptop/Mobile Upgrade")
-        if random.random() < 0.4:
-            picks.add("Travel")
-
-    if age and age > 30:
-        # increased chance of home / retirement / vehicle / marriage
-        if random.random() < 0.4:
-            picks.add("Home Down Payment")
-        if random.random() < 0.6:
-            picks.add("Retirement")
+    picks[:, EDUCATION] |= is_student
+    picks[:, LAPTOP] |= is_student & (gates[:, 1] < 0.6)
+    picks[:, TRAVEL] |= is_student & (gates[:, 2] < 0.4)
+
+    # increased chance of home / retirement for 30+
+    older = age > 30
+    picks[:, HOME] |= older & (gates[:, 3] < 0.4)
+    picks[:, RETIREMENT] |= older & (gates[:, 4] < 0.6)
 
     # archetype biases
-    if archetype:
-        a = archetype.lower()
-        if "impulsive" in a:
-            picks.update(["Travel", "Luxury Purchase"])
-        if "goal" in a or "planner" in a or "optimizer" in a:
-            picks.update(["Home Down Payment", "Investment Wealth Goal", "Retirement"])
-        if "aggressive" in a or "investor" in a:
-            picks.update(["Investment Wealth Goal", "Business Startup"])
-
-    # fill random choices until n reached
-    while len(picks) < n:
-        picks.add(random.choice(candidates))
-
-    # convert to list and trim to n
-    picks = list(picks)[:n]
-    return picks
+    for code in (TRAVEL, LUXURY):
+        picks[:, code] |= is_impulsive
+    for code in (HOME, INVESTMENT, RETIREMENT):
+        picks[:, code] |= is_planner
+    for code in (INVESTMENT, BUSINESS):
+        picks[:, code] |= is_investor
+
+    # Rank picked goals ahead of the rest in random order, then keep the first n:
+    # fills up with random extra goals, or trims an oversized pick set at random
+    keys = rng.random((n_users, n_types)) - picks
+    order = np.argsort(keys, axis=1)
+    keep = np.arange(n_types)[None, :] < n[:, None]
+    return np.repeat(np.arange(n_users), n), order[keep]
 
 def generate_financial_goals():
     user_file = find_user_file()
@@ -219,92 +263,97 @@ def generate_financial_goals():
     if "user_id" not in df_users.columns:
         raise KeyError("User profile file must contain 'user_id' column")
     # optional columns: monthly_income, monthly_expenses, age, user_archetype, savings_rate, is_student
-    rows = []
-    seq = 1
-    now = datetime.utcnow().strftime("%Y-%m-%d")
-
-    for idx, u in df_users.iterrows():
-        urow = u.to_dict()
-        user_id = urow.get("user_id")
-        age = int(safe_get(urow, "age", 30) or 30)
-        archetype = safe_get(urow, "user_archetype", "") or ""
-        is_student = str(safe_get(urow, "is_student", "No")).strip().lower() in ["yes","true","1"]
-        monthly_income = float(safe_get(urow, "monthly_income", 0.0) or 0.0)
-        monthly_expenses = float(safe_get(urow, "monthly_expenses", max(0.0, monthly_income*0.6)) or 0.0)
-        savings_rate = float(safe_get(urow, "savings_rate", 0.0) or 0.0)
-
-        # choose 1-4 goals
-        goal_types = pick_goal_types_for_user(age, archetype, is_student, monthly_income, 0)
-
-        for g in goal_types:
-            years = years_to_target_by_goal(g, age, archetype)
-            months = months_to_target(years)
-            target_amount = estimate_target_amount(g, monthly_income, monthly_expenses, age)
-            # ensure target > 0
-            target_amount = max(1000.0, float(target_amount))
-
-            # current saved (some fraction of target; more for planners)
-            base_saved_frac = 0.10
-            if "planner" in archetype.lower() or "goal" in archetype.lower() or "optimizer" in archetype.lower():
-                base_saved_frac = random.uniform(0.15, 0.40)
-            if is_student:
-                base_saved_frac = random.uniform(0.01, 0.10)
-            current_saved = round(target_amount * base_saved_frac * random.uniform(0.5, 1.0), 2)
-
-            # monthly commitment: try to use user's savings capacity first
-            # savings capacity estimated as monthly_income * savings_rate (if present)
-            savings_capacity = monthly_income * (savings_rate if savings_rate>0 else 0.15)
-            # required monthly = (target - current_saved) / months
-            required_monthly = max(0.0, (target_amount - current_saved) / months)
-            # realistic commitment: min(required_monthly, savings_capacity * factor)
-            factor = random.uniform(0.5, 1.2)
-            monthly_commitment = round(min(required_monthly, max(0.0, savings_capacity * factor)), 2)
-
-            # if commitment is zero (no capacity), set a very small commitment as placeholder
-            if monthly_commitment <= 0:
-                monthly_commitment = round(max(0.0, required_monthly * random.uniform(0.05, 0.15)), 2)
-
-            # target date: today + months
-            target_date = (datetime.utcnow() + timedelta(days=months*30)).strftime("%Y-%m-%d")
-
-            # priority: base + modifiers
-            priority = DEFAULT_PRIORITY.get(g, 5)
-            # nudge priority if current_saved low relative to target, or if emergency
-            if g == "Emergency Fund":
-                if current_saved < target_amount * 0.5:
-                    priority += 1
-            # archetype adjustments
-            if "impulsive" in archetype.lower() and g == "Travel":
-                priority += 1
-            priority = clamp_priority(priority + random.randint(-2,2))
-
-            # risk bucket for goal
-            risk_bucket = choose_risk_by_goal(g, archetype)
-
-            # progress percent
-            progress_percent = round(100.0 * current_saved / target_amount, 2)
-
-            # textual description
-            description = f"{g} target of ₹{target_amount:,.0f}"
-
-            rows.append({
-                "goal_id": generate_goal_id(seq),
-                "user_id": user_id,
-                "goal_type": g,
-                "goal_description": description,
-                "target_amount": round(target_amount,2),
-                "current_saved": round(current_saved,2),
-                "monthly_commitment": monthly_commitment,
-                "months_to_target": months,
-                "target_date": target_date,
-                "goal_created_date": now,
-                "priority_score": priority,
-                "risk_category": risk_bucket,
-                "progress_percent": progress_percent
-            })
-            seq += 1
-
-    df_out = pd.DataFrame(rows)
+    def column(key, default):
+        if key in df_users.columns:
+            return df_users[key]
+        return pd.Series(default, index=df_users.index)
+
+    age = pd.to_numeric(column("age", 30), errors="coerce").fillna(30).replace(0, 30).astype(int).to_numpy()
+    # archetype flags, matched once per user and indexed per goal below
+    a_low = column("user_archetype", "").fillna("").astype(str).str.lower()
+    is_impulsive = a_low.str.contains("impulsive").to_numpy()
+    is_planner = a_low.str.contains("goal|planner|optimizer").to_numpy()
+    is_investor = a_low.str.contains("aggressive|investor").to_numpy()
+    is_student = column("is_student", "No").astype(str).str.strip().str.lower().isin(["yes", "true", "1"]).to_numpy()
+    monthly_income = pd.to_numeric(column("monthly_income", 0.0), errors="coerce").fillna(0.0).to_numpy()
+    if "monthly_expenses" in df_users.columns:
+        monthly_expenses = pd.to_numeric(df_users["monthly_expenses"], errors="coerce").fillna(0.0).to_numpy()
+    else:
+        monthly_expenses = np.maximum(0.0, monthly_income * 0.6)
+    savings_rate = pd.to_numeric(column("savings_rate", 0.0), errors="coerce").fillna(0.0).to_numpy()
+
+    # choose 1-4 goals per user; every later array has one entry per goal
+    user_idx, g = pick_goal_types_for_user(age, is_student, monthly_income, is_impulsive, is_planner, is_investor)
+    n_goals = len(g)
+    g_age = age[user_idx]
+    g_income = monthly_income[user_idx]
+    g_student = is_student[user_idx]
+    g_planner = is_planner[user_idx]
+    g_impulsive = is_impulsive[user_idx]
+
+    years = years_to_target_by_goal(g, g_age)
+    months = months_to_target(years)
+    target_amount = estimate_target_amount(g, g_income, monthly_expenses[user_idx], g_age)
+    # ensure target > 0
+    target_amount = np.maximum(1000.0, target_amount)
+
+    # current saved (some fraction of target; more for planners)
+    base_saved_frac = np.full(n_goals, 0.10)
+    base_saved_frac = np.where(g_planner, rng.uniform(0.15, 0.40, n_goals), base_saved_frac)
+    base_saved_frac = np.where(g_student, rng.uniform(0.01, 0.10, n_goals), base_saved_frac)
+    current_saved = np.round(target_amount * base_saved_frac * rng.uniform(0.5, 1.0, n_goals), 2)
+
+    # monthly commitment: try to use user's savings capacity first
+    # savings capacity estimated as monthly_income * savings_rate (if present)
+    g_rate = savings_rate[user_idx]
+    savings_capacity = g_income * np.where(g_rate > 0, g_rate, 0.15)
+    # required monthly = (target - current_saved) / months
+    required_monthly = np.maximum(0.0, (target_amount - current_saved) / months)
+    # realistic commitment: min(required_monthly, savings_capacity * factor)
+    factor = rng.uniform(0.5, 1.2, n_goals)
+    monthly_commitment = np.round(np.minimum(required_monthly, np.maximum(0.0, savings_capacity * factor)), 2)
+
+    # if commitment is zero (no capacity), set a very small commitment as placeholder
+    placeholder = np.round(np.maximum(0.0, required_monthly * rng.uniform(0.05, 0.15, n_goals)), 2)
+    monthly_commitment = np.where(monthly_commitment <= 0, placeholder, monthly_commitment)
+
+    # target date: today + months
+    today = np.datetime64(datetime.utcnow(), "D")
+    target_date = np.datetime_as_string(today + months * 30, unit="D")
+
+    # priority: base + modifiers
+    priority = PRIORITY_BY_CODE[g].copy()
+    # nudge priority if emergency fund is less than half saved
+    priority += (g == EMERGENCY) & (current_saved < target_amount * 0.5)
+    # archetype adjustments
+    priority += g_impulsive & (g == TRAVEL)
+    priority = clamp_priority(priority + rng.integers(-2, 3, n_goals))
+
+    # risk bucket for goal
+    risk_bucket = choose_risk_by_goal(g, g_impulsive)
+
+    # progress percent
+    progress_percent = np.round(100.0 * current_saved / target_amount, 2)
+
+    # textual description
+    goal_type = GOAL_TYPES_ARR[g]
+    description = pd.Series(goal_type) + " target of ₹" + pd.Series(target_amount).map("{:,.0f}".format)
+
+    df_out = pd.DataFrame({
+        "goal_id": generate_goal_id(np.arange(1, n_goals + 1)),
+        "user_id": df_users["user_id"].to_numpy()[user_idx],
+        "goal_type": goal_type,
+        "goal_description": description,
+        "target_amount": np.round(target_amount, 2),
+        "current_saved": np.round(current_saved, 2),
+        "monthly_commitment": monthly_commitment,
+        "months_to_target": months,
+        "target_date": target_date,
+        "goal_created_date": str(today),
+        "priority_score": priority,
+        "risk_category": risk_bucket,
+        "progress_percent": progress_percent
+    })
     df_out.to_csv(OUTPUT_FILE, index=False)
     # summary
     print("\n✅ Financial Goals dataset generated:", OUTPUT_FILE)
@@ -1,27 +1,26 @@
 import pandas as pd
 import numpy as np
 
-# Load datasets
-users = pd.read_csv("users_profile_full_v3.csv")
-monthly_expenses = pd.read_csv("monthly_expenses_12m.csv")
-transactions = pd.read_csv("transaction_data_12months.csv")
-credit_loans = pd.read_csv("credit_loans_12m.csv")
-investments = pd.read_csv("investment_data_12months.csv")
-income = pd.read_csv("income_data_12months.csv")
-financial_goals = pd.read_csv("financial_goals_12months.csv")
-fraud_signals = pd.read_csv("fraud_signals_12months.csv")
-subscriptions = pd.read_csv("subscriptions_12months.csv")
-
-# Standardize dates based on your actual columns
-monthly_expenses['month_start_date'] = pd.to_datetime(monthly_expenses['month_start_date'], errors='coerce')
-transactions['date'] = pd.to_datetime(transactions['date'], errors='coerce')
-credit_loans['month'] = pd.to_datetime(credit_loans['month'], errors='coerce')
-investments['month'] = pd.to_datetime(investments['month'], errors='coerce')
-income['month'] = pd.to_datetime(income['month'], errors='coerce')
-financial_goals['target_date'] = pd.to_datetime(financial_goals['target_date'], errors='coerce')
-financial_goals['goal_created_date'] = pd.to_datetime(financial_goals['goal_created_date'], errors='coerce')
-subscriptions['month'] = pd.to_datetime(subscriptions['month'], errors='coerce')
-fraud_signals['date'] = pd.to_datetime(fraud_signals['date'], errors='coerce', format='%Y-%m-%d %H:%M:%S')
+# Load datasets (pyarrow parses in parallel and converts ISO dates natively)
+users = pd.read_csv("users_profile_full_v3.csv", engine="pyarrow")
+monthly_expenses = pd.read_csv("monthly_expenses_12m.csv", engine="pyarrow", parse_dates=['month_start_date'])
+transactions = pd.read_csv("transaction_data_12months.csv", engine="pyarrow", parse_dates=['date'],
+                           dtype={'category': 'category'})
+credit_loans = pd.read_parquet("credit_loans_12m.parquet")
+investments = pd.read_csv("investment_data_12months.csv", engine="pyarrow")
+income = pd.read_csv("income_data_12months.csv", engine="pyarrow")
+financial_goals = pd.read_csv("financial_goals_12months.csv", engine="pyarrow",
+                              parse_dates=['target_date', 'goal_created_date'],
+                              dtype={'goal_type': 'category', 'risk_category': 'category'})
+fraud_signals = pd.read_csv("fraud_signals_12months.csv", engine="pyarrow", parse_dates=['date'],
+                            dtype={'fraud_label': 'category', 'severity': 'category'})
+subscriptions = pd.read_csv("subscriptions_12months.csv", engine="pyarrow")
+
+# Standardize the year-month columns based on your actual columns
+credit_loans['month'] = pd.to_datetime(credit_loans['month'], errors='coerce', format='%Y-%m')
+investments['month'] = pd.to_datetime(investments['month'], errors='coerce', format='%Y-%m')
+income['month'] = pd.to_datetime(income['month'], errors='coerce', format='%Y-%m')
+subscriptions['month'] = pd.to_datetime(subscriptions['month'], errors='coerce', format='%Y-%m')
 
 # Expense categories
 expense_categories = [
@@ -32,23 +31,36 @@ expense_categories = [
 
 # 1. Aggregate monthly spending and category percentages
 monthly_expenses['total_category_expenses'] = monthly_expenses[expense_categories].sum(axis=1)
-for cat in expense_categories:
-    monthly_expenses[f'{cat}_pct'] = monthly_expenses[cat]/monthly_expenses['monthly_expenses'].replace({0: np.nan})
+spend_denominator = monthly_expenses['monthly_expenses'].replace({0: np.nan}).to_numpy()
+monthly_expenses[[f'{c}_pct' for c in expense_categories]] = monthly_expenses[expense_categories].to_numpy() / spend_denominator[:, None]
 
 # Rolling averages and month-on-month changes
 monthly_expenses = monthly_expenses.sort_values(by=['user_id', 'month_start_date'])
-for cat in expense_categories + ['monthly_expenses', 'monthly_surplus', 'savings_rate']:
-    monthly_expenses[f'{cat}_1m_avg'] = monthly_expenses.groupby('user_id')[cat].transform(lambda x: x.rolling(window=1).mean())
-    monthly_expenses[f'{cat}_3m_avg'] = monthly_expenses.groupby('user_id')[cat].transform(lambda x: x.rolling(window=3, min_periods=1).mean())
-    monthly_expenses[f'{cat}_6m_avg'] = monthly_expenses.groupby('user_id')[cat].transform(lambda x: x.rolling(window=6, min_periods=1).mean())
-    monthly_expenses[f'{cat}_mom_change'] = monthly_expenses.groupby('user_id')[cat].pct_change()
+rolling_cols = expense_categories + ['monthly_expenses', 'monthly_surplus', 'savings_rate']
+monthly_expenses[[f'{c}_1m_avg' for c in rolling_cols]] = monthly_expenses[rolling_cols].to_numpy()  # 1-month window is the value itself
+# One grouped pass per window (and for MoM change) over the whole column block
+user_groups = monthly_expenses.groupby('user_id', sort=False)[rolling_cols]
+monthly_expenses[[f'{c}_mom_change' for c in rolling_cols]] = user_groups.pct_change().to_numpy()
+for window in (3, 6):
+    rolled = user_groups.rolling(window=window, min_periods=1).mean().reset_index(level=0, drop=True)
+    monthly_expenses = monthly_expenses.join(rolled.add_suffix(f'_{window}m_avg'))
 
 # 2. Risk assessment aggregation
-fraud_by_user = fraud_signals.groupby('user_id').agg({
-    'fraud_label': lambda x: x.nunique(),
-    'flagged_amount': 'sum',
-    'severity': lambda x: x.mode()[0] if not x.mode().empty else 'low'
-}).rename(columns={'fraud_label': 'fraud_types_count', 'flagged_amount': 'total_fraud_flagged_amount'})
+fraud_by_user = fraud_signals.groupby('user_id').agg(
+    fraud_types_count=('fraud_label', 'nunique'),
+    total_fraud_flagged_amount=('flagged_amount', 'sum')
+)
+# Most frequent severity per user; the stable sort keeps ties on the alphabetically first value, as Series.mode does
+severity_mode = (
+    fraud_signals.groupby(['user_id', 'severity'], observed=True).size()
+    .sort_values(ascending=False, kind='stable')
+    .reset_index()
+    .drop_duplicates('user_id')
+    .set_index('user_id')['severity']
+)
+# fill before astype(str), which would turn missing values into 'nan'; via object since
+# 'low' is not one of the severity categories
+fraud_by_user['severity'] = severity_mode.reindex(fraud_by_user.index).astype(object).fillna('low').astype(str)
 
 credit_loans_avg = credit_loans.groupby('user_id').agg({
     'credit_utilization': 'mean',
@@ -91,9 +103,11 @@ subscription_features = subscriptions.groupby('user_id').agg({
 })
 
 # 6. Seasonal spending features - compute distribution of monthly expenditure
-seasonal_spend = monthly_expenses.groupby('user_id').agg({cat: 'mean' for cat in expense_categories})
-seasonal_spend['spend_std_dev'] = monthly_expenses.groupby('user_id')['monthly_expenses'].std()
-seasonal_spend['spend_mean'] = monthly_expenses.groupby('user_id')['monthly_expenses'].mean()
+expense_groups = monthly_expenses.groupby('user_id')  # shared by the seasonal and cashflow blocks
+seasonal_spend = expense_groups[expense_categories].mean()
+spend_stats = expense_groups['monthly_expenses'].agg(['std', 'mean'])
+seasonal_spend['spend_std_dev'] = spend_stats['std']
+seasonal_spend['spend_mean'] = spend_stats['mean']
 seasonal_spend['seasonality_index'] = seasonal_spend['spend_std_dev'] / seasonal_spend['spend_mean']
 
 # 7. Life event detection features based on financial goals
@@ -105,21 +119,18 @@ goal_features = financial_goals.groupby('user_id').agg({
 })
 
 # 8. Cashflow features
-cashflow_features = monthly_expenses.groupby('user_id').agg({
-    'monthly_surplus': ['mean', 'std'],
-    'savings_rate': ['mean']
-})
-cashflow_features.columns = ['cashflow_surplus_mean', 'cashflow_surplus_std', 'avg_savings_rate']
+cashflow_features = expense_groups.agg(
+    cashflow_surplus_mean=('monthly_surplus', 'mean'),
+    cashflow_surplus_std=('monthly_surplus', 'std'),
+    avg_savings_rate=('savings_rate', 'mean')
+)
 
 # 9. Merchant behavior features
-merchant_spend = transactions.groupby(['user_id', 'category'])['amount'].sum().unstack(fill_value=0)
+merchant_spend = transactions.groupby(['user_id', 'category'], observed=True)['amount'].sum().unstack(fill_value=0)
 merchant_spend_pct = merchant_spend.div(merchant_spend.sum(axis=1), axis=0)
 
 # 10. Goal achievement features (aggregated)
-goal_achievement_features = financial_goals.groupby('user_id').agg({
-    'progress_percent': 'mean',
-    'priority_score': 'max'
-})
+goal_achievement_features = goal_features[['progress_percent', 'priority_score']]  # same aggregates as section 7
 
 # 11. Archetype from users dataset
 archetype_features = users.set_index('user_id')[['user_archetype']]
@@ -137,8 +148,26 @@ feature_dfs = [
     archetype_features
 ]
 
-master_features = pd.concat(feature_dfs, axis=1).fillna(0)
+# Align the frames on dense int codes instead of re-hashing the mixed int/str user_id index per frame
+user_ids = feature_dfs[0].index.append([df.index for df in feature_dfs[1:]]).unique()
+user_code = pd.Series(np.arange(len(user_ids)), index=user_ids)
+feature_dfs = [df.set_axis(user_code.reindex(df.index).to_numpy()) for df in feature_dfs]
 
-master_features.to_csv("finbuddy_master_features.csv")
+master_features = pd.concat(feature_dfs, axis=1).fillna(0)
+master_features.index = user_ids[master_features.index].rename('user_id')
+
+# Parquet needs unique column names and single-typed columns: number repeated
+# names the way read_csv used to ("stocks.1") and store the mixed 0/str columns as str
+seen = {}
+unique_cols = []
+for col in master_features.columns:
+    unique_cols.append(f"{col}.{seen[col]}" if col in seen else col)
+    seen[col] = seen.get(col, 0) + 1
+master_features.columns = unique_cols
+obj_cols = master_features.select_dtypes(include=['object']).columns
+master_features[obj_cols] = master_features[obj_cols].astype(str).astype('category')
+master_features.index = master_features.index.astype(str)
+
+master_features.to_parquet("finbuddy_master_features.parquet", compression='zstd')
 
 print(f"Feature engineering complete: {master_features.shape}")
@@ -1,7 +1,5 @@
 import pandas as pd
 import numpy as np
-import random
-from tqdm import tqdm
 
 # ✅ Input: Your previously generated transactions dataset
 TRANSACTION_FILE = "transaction_data_12months.csv"
@@ -34,30 +32,16 @@ def generate_fraud_signals():
     fraud_samples = df_tx.sample(num_fraud, random_state=42).copy()
     fraud_samples.reset_index(drop=True, inplace=True)
 
-    fraud_data = []
-    for idx, row in tqdm(fraud_samples.iterrows(), total=num_fraud, desc="Generating fraud labels"):
-
-        fraud_type = random.choice(FRAUD_TYPES)
-        severity = random.choices(SEVERITY_LEVELS, weights=[0.2, 0.4, 0.3, 0.1], k=1)[0]
-
-        flagged_amount = round(row["amount"] * np.random.uniform(1.1, 2.5), 2)
-
-        fraud_data.append([
-            row["transaction_id"], row["user_id"], row["date"],
-            fraud_type, severity,
-            flagged_amount,
-            "Fraudulent"  # ✅ ground truth label
-        ])
-
-    df_fraud = pd.DataFrame(
-        fraud_data,
-        columns=[
-            "transaction_id", "user_id", "date",
-            "fraud_type", "severity",
-            "flagged_amount",
-            "fraud_label"
-        ]
-    )
+    rng = np.random.default_rng(42)
+    df_fraud = pd.DataFrame({
+        "transaction_id": fraud_samples["transaction_id"],
+        "user_id": fraud_samples["user_id"],
+        "date": fraud_samples["date"],
+        "fraud_type": rng.choice(FRAUD_TYPES, size=num_fraud),
+        "severity": rng.choice(SEVERITY_LEVELS, size=num_fraud, p=[0.2, 0.4, 0.3, 0.1]),
+        "flagged_amount": np.round(fraud_samples["amount"].to_numpy() * rng.uniform(1.1, 2.5, num_fraud), 2),
+        "fraud_label": "Fraudulent"  # ✅ ground truth label
+    })
 
     df_fraud.to_csv(OUTPUT_FILE, index=False)
 
@@ -15,8 +15,11 @@ Notes:
 
 import pandas as pd
 import numpy as np
-import random
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import os
+from data_cache import load_csv
+from parallel_chunks import chunk_bounds, run_chunks
 
 # ---------------- CONFIG ----------------
 POSSIBLE_USER_FILES = [
@@ -28,8 +31,7 @@ POSSIBLE_USER_FILES = [
 ]
 OUTPUT_FILE = "income_data_12months.csv"
 SEED = 42
-np.random.seed(SEED)
-random.seed(SEED)
+MIN_CHUNK_USERS = 50000  # per worker; the vectorized draws for 10k users take less than starting one
 
 # Months: May 2024 -> Apr 2025
 MONTHS = [
@@ -41,6 +43,10 @@ MONTHS = [
 BASE_INCOME_TYPES = ["salary", "commission", "freelance", "stipend"]
 # We'll infer income_type from profile if column exists; otherwise assign probabilistically.
 
+# Per-type base fraction of monthly_income and noise sigma (std dev fraction)
+BASE_FRACTION = {"salary": 1.0, "commission": 0.9, "freelance": 0.7, "stipend": 0.6}
+SIGMA = {"salary": 0.03, "commission": 0.10, "freelance": 0.18, "stipend": 0.02}
+
 # Helper utilities
 def find_user_file():
     for f in POSSIBLE_USER_FILES:
@@ -50,133 +56,108 @@ def find_user_file():
         "No user profile file found. Looked for: " + ", ".join(POSSIBLE_USER_FILES)
     )
 
-def safe_get(row, key, default=None):
-    return row.get(key) if key in row else default
+def column(df, key, default):
+    if key in df.columns:
+        return df[key]
+    return pd.Series(default, index=df.index)
+
+def yes_no_mask(series):
+    return series.astype(str).str.strip().str.lower().isin(["yes", "true", "1"]).to_numpy()
+
+def choose_income_type(rng, df_users):
+    """Income type per user; one uniform draw per user settles the heuristic coin flips."""
+    is_student = df_users["is_student"].to_numpy()
+    is_metro = df_users["is_metro"].to_numpy()
+    years_exp = pd.to_numeric(column(df_users, "years_experience", 3), errors="coerce").to_numpy()
+    u = rng.random(len(df_users))
+
+    heuristic = np.select(
+        [
+            is_student,  # Students -> stipend with high chance
+            years_exp < 2,  # Young with low experience -> freelancer or salary
+            is_metro & (years_exp >= 3),  # Metro & higher experience -> salary/commission mix
+        ],
+        [
+            np.where(u < 0.7, "stipend", "freelance"),
+            np.where(u < 0.35, "freelance", "salary"),
+            np.where(u < 0.25, "commission", "salary"),
+        ],
+        default="salary"
+    )
 
-def choose_income_type(row):
     # If user file includes an 'income_type' column, use it (normalized)
-    it = safe_get(row, "income_type", None)
-    if pd.notnull(it) and isinstance(it, str):
-        it = it.strip().lower()
-        if it in BASE_INCOME_TYPES:
-            return it
-    # otherwise heuristics:
-    is_student = str(safe_get(row, "is_student", "No")).strip().lower() in ["yes", "true", "1"]
-    age = int(safe_get(row, "age", 30) or 30)
-    years_exp = float(safe_get(row, "years_experience", 3) or 0)
-
-    # Students -> stipend with high chance
-    if is_student:
-        return "stipend" if random.random() < 0.7 else "freelance"
-
-    # Young with low experience -> freelancer or salary
-    if years_exp < 2:
-        return "freelance" if random.random() < 0.35 else "salary"
-
-    # Metro & higher experience -> salary/commission mix
-    is_metro = str(safe_get(row, "is_metro", "No")).strip().lower() in ["yes", "true", "1"]
-    if is_metro and years_exp >= 3:
-        return "commission" if random.random() < 0.25 else "salary"
-
-    # Default
-    return "salary"
+    given = column(df_users, "income_type", "").fillna("").astype(str).str.strip().str.lower().to_numpy()
+    return np.where(np.isin(given, BASE_INCOME_TYPES), given, heuristic)
 
 def compute_base_growth_rate(years_experience):
     """
     Return an annualized growth rate (decimal) applied progressively.
     More experience -> smaller but steadier raises; junior -> higher % variability.
     """
-    if years_experience is None:
-        years_experience = 3.0
-    try:
-        y = float(years_experience)
-    except:
-        y = 3.0
-    if y < 1:
-        return 0.05  # 5% annual approx for early-career (but can be variable)
-    if y < 4:
-        return 0.04
-    if y < 8:
-        return 0.03
-    return 0.02
+    y = years_experience
+    return np.select([y < 1, y < 4, y < 8], [0.05, 0.04, 0.03], default=0.02)
 
 def month_growth_multiplier(annual_rate):
     """
-    Convert annual rate to a modest per-quarter step: we will add growth
-    as small increments every 3 months to simulate raises/promotions.
-    Return list of length 12 with cumulative multipliers.
+    Convert annual rate to a modest per-quarter step: growth is added as small
+    increments every 3 months to simulate raises/promotions.
+    Returns an (N, 12) array of cumulative multipliers.
     """
-    # We'll implement quarterly bump: every 3 months add approx (annual_rate/4)
-    quarter_inc = annual_rate / 4.0
-    multipliers = []
-    cum = 1.0
-    for m in range(12):
-        if m % 3 == 0 and m != 0:
-            cum *= (1 + quarter_inc)
-        multipliers.append(cum)
-    return multipliers
-
-def simulate_month_income(base_income, income_type, monthly_multiplier, volatility_params):
+    # Only a handful of distinct rates exist (experience bracket +/- risk bump):
+    # build one row per distinct rate and gather
+    rates, user_rate = np.unique(annual_rate, return_inverse=True)
+    quarters = np.arange(len(MONTHS)) // 3
+    table = (1 + rates[:, None] / 4.0) ** quarters[None, :]
+    return table[user_rate]
+
+def simulate_month_income(rng, base_income, income_type, monthly_multiplier):
     """
-    Generate an income for a month given a base income and type.
-    volatility_params: dict with sigma (std dev fraction), bonus_prob, bonus_scale
+    Generate (N, 12) monthly incomes given per-user base incomes and types.
     """
-    sigma = volatility_params.get("sigma", 0.02)
-    # Base amount (may be fraction of base for stipend/freelance)
-    if income_type == "stipend":
-        base = base_income * 0.6  # stipend usually smaller than base_income
-    elif income_type == "freelance":
-        base = base_income * 0.7
-    elif income_type == "commission":
-        base = base_income * 0.9
-    else:
-        base = base_income
+    shape = monthly_multiplier.shape
+    fraction = pd.Series(income_type).map(BASE_FRACTION).to_numpy()
+    sigma = pd.Series(income_type).map(SIGMA).to_numpy()
 
-    # Apply growth multiplier (from promotions/raises)
-    base = base * monthly_multiplier
+    # Base amount (may be fraction of base for stipend/freelance), with growth from promotions/raises
+    base = (base_income * fraction)[:, None] * monthly_multiplier
 
     # Normal noise
-    noise = np.random.normal(loc=0.0, scale=sigma * base)
-    month_amount = base + noise
-
-    # Commission/freelance occasionally get spikes / zeros
-    if income_type == "freelance":
-        # chance of zero or big spike
-        if random.random() < 0.08:
-            # lean month
-            month_amount *= random.uniform(0.0, 0.6)
-        if random.random() < 0.12:
-            # big contract
-            spike = base * random.uniform(0.8, 3.0)
-            month_amount += spike
-    if income_type == "commission":
-        # occasional bonus spikes
-        if random.random() < 0.15:
-            month_amount += base * random.uniform(0.2, 1.0)
+    month_amount = base + rng.standard_normal(shape) * sigma[:, None] * base
+
+    freelance = (income_type == "freelance")[:, None]
+    commission = (income_type == "commission")[:, None]
+    stipend = (income_type == "stipend")[:, None]
+    # one batch of uniforms for all the event masks below
+    u = rng.random(shape + (4,))
+
+    # Freelance: chance of a lean month, and of a big contract
+    lean = freelance & (u[..., 0] < 0.08)
+    month_amount = np.where(lean, month_amount * rng.uniform(0.0, 0.6, shape), month_amount)
+    contract = freelance & (u[..., 1] < 0.12)
+    month_amount = np.where(contract, month_amount + base * rng.uniform(0.8, 3.0, shape), month_amount)
+
+    # Commission: occasional bonus spikes
+    bonus = commission & (u[..., 2] < 0.15)
+    month_amount = np.where(bonus, month_amount + base * rng.uniform(0.2, 1.0, shape), month_amount)
 
     # Stipend tends to be stable but sometimes missed
-    if income_type == "stipend":
-        if random.random() < 0.02:
-            month_amount *= random.uniform(0.5, 0.95)
+    missed = stipend & (u[..., 3] < 0.02)
+    month_amount = np.where(missed, month_amount * rng.uniform(0.5, 0.95, shape), month_amount)
 
     # Ensure non-negative and round to 2 decimals
-    month_amount = max(0.0, round(float(month_amount), 2))
-    return month_amount
+    return np.maximum(0.0, np.round(month_amount, 2))
 
 def compute_volatility_score(monthly_values):
-    arr = np.array(monthly_values, dtype=float)
-    if arr.mean() <= 0:
-        return 100.0
+    mean = monthly_values.mean(axis=1)
     # volatility measured as coefficient of variation (std / mean) scaled 0-100
-    cov = arr.std() / (arr.mean() + 1e-9)
-    score = min(100.0, cov * 100.0 * 1.5)  # scale factor to get interpretable 0-100
-    return round(float(score), 2)
+    cov = monthly_values.std(axis=1) / (mean + 1e-9)
+    score = np.minimum(100.0, cov * 100.0 * 1.5)  # scale factor to get interpretable 0-100
+    return np.where(mean <= 0, 100.0, np.round(score, 2))
 
 def compute_income_stability_index(volatility_score, missed_payments_count=0):
     # stability decreases with volatility and missed payments
     penalty = missed_payments_count * 3.0
-    idx = max(0.0, 100.0 - volatility_score - penalty)
-    return round(float(idx), 2)
+    return np.round(np.maximum(0.0, 100.0 - volatility_score - penalty), 2)
 
 # ---------------- Main generation ----------------
 def generate_income_dataset():
@@ -185,7 +166,7 @@ def generate_income_dataset():
     if user_file.endswith(".xlsx"):
         df_users = pd.read_excel(user_file)
     else:
-        df_users = pd.read_csv(user_file)
+        df_users = load_csv(user_file)
 
     # check required column existence
     if "user_id" not in df_users.columns:
@@ -198,116 +179,86 @@ def generate_income_dataset():
         else:
             raise KeyError("User profile file must contain 'monthly_income' column or similar")
 
-    output_rows = []
-    skipped_users = 0
-
-    for idx, urow in df_users.iterrows():
-        user = urow.to_dict()
-        user_id = user["user_id"]
-        try:
-            base_income = float(user.get("monthly_income", 0) or 0)
-        except:
-            base_income = 0.0
-
-        # decide income type
-        income_type = choose_income_type(user)
-
-        # determine years_experience (influences growth)
-        try:
-            years_exp = float(user.get("years_experience", 3.0) or 3.0)
-        except:
-            years_exp = 3.0
-
-        # compute an annual base growth rate influenced by experience + archetype
-        annual_growth = compute_base_growth_rate(years_exp)
-
-        # small adjust for high performers / risk_tolerance column if present
-        rt = str(user.get("risk_tolerance", "")).strip().lower()
-        if rt in ["high", "3", "4", "5"]:
-            # risk tolerant often in gig economy -> potentially higher raises (but riskier)
-            annual_growth += 0.005
-
-        # monthly growth multipliers
-        monthly_multipliers = month_growth_multiplier(annual_growth)
-
-        # volatility tuning by income type
-        if income_type == "salary":
-            volatility_params = {"sigma": 0.03}
-        elif income_type == "commission":
-            volatility_params = {"sigma": 0.10}
-        elif income_type == "freelance":
-            volatility_params = {"sigma": 0.18}
-        else:  # stipend
-            volatility_params = {"sigma": 0.02}
-
-        # payment day: salaries often 1-7, commissions variable, freelance random
-        if income_type == "salary":
-            payment_day = int(user.get("salary_day", random.randint(1, 7)) or random.randint(1, 7))
-        elif income_type == "commission":
-            payment_day = random.randint(1, 15)
-        elif income_type == "freelance":
-            payment_day = random.randint(1, 28)
-        else:
-            payment_day = random.randint(1, 28)
-
-        monthly_vals = []
-        months_failed = 0
-        for m_idx, month in enumerate(MONTHS):
-            mult = monthly_multipliers[m_idx]
-            income_amount = simulate_month_income(base_income, income_type, mult, volatility_params)
-            # simulate rare missed payment for salary (e.g., company delay) or freelancer (no gigs)
-            if income_type == "salary":
-                if random.random() < 0.01:  # 1% chance salary delayed/reduced
-                    income_amount *= random.uniform(0.5, 0.95)
-                    months_failed += 1
-            elif income_type == "freelance":
-                if random.random() < 0.08:  # chance of near-zero month
-                    if random.random() < 0.5:
-                        income_amount = round(income_amount * random.uniform(0.0, 0.5), 2)
-                        if income_amount < 1.0:
-                            months_failed += 1
-
-            monthly_vals.append(income_amount)
-            output_rows.append({
-                "user_id": user_id,
-                "month": month,
-                "base_income": round(base_income, 2),
-                "income_actual": income_amount,
-                "income_type": income_type,
-                "payment_day": payment_day,
-                "annual_growth_rate": round(annual_growth, 4)
-            })
-
-        # compute stability metrics (per user across 12 months)
-        vol_score = compute_volatility_score(monthly_vals)
-        stability_index = compute_income_stability_index(vol_score, months_failed)
-
-        # attach these metrics to the user's rows (post-hoc)
-        # We'll add a small pass to update the last 12 appended rows for this user
-        for i in range(12):
-            output_rows[-1 - i]["volatility_score"] = vol_score
-            output_rows[-1 - i]["income_stability_index"] = stability_index
-            output_rows[-1 - i]["months_missed_payments"] = months_failed
-
-    # convert to DataFrame and save
-    df_out = pd.DataFrame(output_rows)
-    # ensure column order
-    cols_order = [
-        "user_id", "month", "income_type", "payment_day", "base_income", "income_actual",
-        "annual_growth_rate", "volatility_score", "income_stability_index", "months_missed_payments"
-    ]
-    # add any extra columns if present
-    for c in cols_order:
-        if c not in df_out.columns:
-            df_out[c] = np.nan
-    df_out = df_out[cols_order]
-
-    df_out.to_csv(OUTPUT_FILE, index=False)
+    # Parse the yes/no and risk flags once into bool columns
+    risk_text = column(df_users, "risk_tolerance", "").astype(str).str.strip().str.lower()
+    df_users = df_users.assign(
+        is_student=yes_no_mask(column(df_users, "is_student", "No")),
+        is_metro=yes_no_mask(column(df_users, "is_metro", "No")),
+        high_risk=risk_text.isin(["high", "3", "4", "5"]).to_numpy()
+    )
+
+    # Users are independent: chunks, each with its own spawned seed
+    chunks = [df_users.iloc[start:end] for start, end in chunk_bounds(len(df_users), MIN_CHUNK_USERS)]
+    parts = run_chunks(generate_income_chunk, chunks, SEED)
+    df_out = pd.concat(parts, ignore_index=True)
+
+    pacsv.write_csv(pa.Table.from_pandas(df_out, preserve_index=False), OUTPUT_FILE)
     print(f"\n✅ Income dataset generated: {OUTPUT_FILE}")
     print("Rows:", len(df_out))
     # quick summary
     print("\nSample summary (first 5 rows):")
     print(df_out.head())
 
+def generate_income_chunk(df_users, seed):
+    rng = np.random.default_rng(seed)
+    n_users = len(df_users)
+    shape = (n_users, len(MONTHS))
+    base_income = pd.to_numeric(df_users["monthly_income"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+    # decide income type
+    income_type = choose_income_type(rng, df_users)
+
+    # determine years_experience (influences growth); missing or 0 falls back to 3
+    years_exp = pd.to_numeric(column(df_users, "years_experience", 3.0), errors="coerce").replace(0, 3.0).to_numpy()
+
+    # compute an annual base growth rate influenced by experience + archetype
+    annual_growth = compute_base_growth_rate(years_exp)
+
+    # small adjust for high performers / risk_tolerance column if present
+    # risk tolerant often in gig economy -> potentially higher raises (but riskier)
+    annual_growth = annual_growth + np.where(df_users["high_risk"].to_numpy(), 0.005, 0.0)
+
+    # monthly growth multipliers
+    monthly_multipliers = month_growth_multiplier(annual_growth)
+
+    # payment day: salaries often 1-7, commissions variable, freelance random
+    payment_day = np.select(
+        [income_type == "salary", income_type == "commission"],
+        [rng.integers(1, 8, n_users), rng.integers(1, 16, n_users)],
+        default=rng.integers(1, 29, n_users)
+    )
+    salary_day = pd.to_numeric(column(df_users, "salary_day", 0), errors="coerce").fillna(0).to_numpy()
+    payment_day = np.where((income_type == "salary") & (salary_day > 0), salary_day, payment_day).astype(int)
+
+    monthly_vals = simulate_month_income(rng, base_income, income_type, monthly_multipliers)
+
+    # simulate rare missed payment for salary (e.g., company delay) or freelancer (no gigs)
+    u = rng.random(shape + (3,))
+    delayed = (income_type == "salary")[:, None] & (u[..., 0] < 0.01)  # 1% chance salary delayed/reduced
+    monthly_vals = np.where(delayed, monthly_vals * rng.uniform(0.5, 0.95, shape), monthly_vals)
+    no_gigs = (income_type == "freelance")[:, None] & (u[..., 1] < 0.08) & (u[..., 2] < 0.5)
+    monthly_vals = np.where(no_gigs, np.round(monthly_vals * rng.uniform(0.0, 0.5, shape), 2), monthly_vals)
+    months_failed = (delayed | (no_gigs & (monthly_vals < 1.0))).sum(axis=1)
+
+    # compute stability metrics (per user across 12 months)
+    vol_score = compute_volatility_score(monthly_vals)
+    stability_index = compute_income_stability_index(vol_score, months_failed)
+
+    def per_month(values):
+        return np.repeat(values, len(MONTHS))
+
+    return pd.DataFrame({
+        "user_id": per_month(df_users["user_id"].to_numpy()),
+        "month": pd.Categorical.from_codes(np.tile(np.arange(len(MONTHS)), n_users), MONTHS, ordered=True),
+        "income_type": pd.Categorical(per_month(income_type), categories=BASE_INCOME_TYPES),
+        "payment_day": per_month(payment_day),
+        "base_income": per_month(np.round(base_income, 2)),
+        "income_actual": monthly_vals.ravel(),
+        "annual_growth_rate": per_month(np.round(annual_growth, 4)),
+        "volatility_score": per_month(vol_score),
+        "income_stability_index": per_month(stability_index),
+        "months_missed_payments": per_month(months_failed)
+    })
+
 if __name__ == "__main__":
     generate_income_dataset()
@@ -1,12 +1,14 @@
-import pandas as pd
+import numpy as np
 from sklearn.cluster import KMeans
 from joblib import dump
+from data_cache import load_master_features
+from model_io import MODEL_COMPRESS
 
-df = pd.read_csv("finbuddy_master_features.csv", index_col=0)
 invest_cols = ['stocks', 'sip', 'crypto', 'gold_bonds', 'total_investment_value']
-X = df[invest_cols].fillna(0)
+df = load_master_features(columns=invest_cols)
+X = df[invest_cols].fillna(0).astype(np.float32)  # a frame keeps feature_names_in_ for extract_feature_lists.py
 
 model = KMeans(n_clusters=5, random_state=42)
 model.fit(X)
-dump(model, "models/investment_clustering.pkl")
+dump(model, "models/investment_clustering.pkl", compress=MODEL_COMPRESS)
 print("Investment Clustering model trained.")
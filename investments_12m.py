@@ -1,6 +1,17 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from tqdm import tqdm
+from data_cache import load_csv
+from parallel_chunks import chunk_bounds, run_chunks
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; simulate_investment_growth falls back to NumPy
+    HAVE_NUMBA = False
+    prange = range
 
 # ===== File Paths =====
 USER_PROFILE_FILE = "users_profile_full_v3.csv"
@@ -11,7 +22,8 @@ MONTHS = [
     "2024-11", "2024-12", "2025-01", "2025-02", "2025-03", "2025-04"
 ]
 
-np.random.seed(42)
+SEED = 42
+MIN_CHUNK_USERS = 50000  # per worker; the vectorized draws for 10k users take less than starting one
 
 # Archetype discipline mapping (0–1 scale)
 ARCHETYPE_DISCIPLINE = {
@@ -30,68 +42,96 @@ RISK_ALLOCATION = {
     "High":   {"stocks": 0.60, "sip": 0.25, "crypto": 0.12, "gold_bonds": 0.03},
 }
 
-def simulate_investment_growth(amount):
-    monthly_return = np.random.normal(0.01, 0.03)
-    return max(0, amount * (1 + monthly_return))
+ASSETS = ["stocks", "sip", "crypto", "gold_bonds"]
+
+def _compound_kernel(contrib, growth):
+    # Sequential scan over months, parallel over users; the four asset values
+    # stay in a small per-user accumulator and only the monthly total is stored
+    n_users, n_months, n_assets = contrib.shape
+    totals = np.empty((n_users, n_months))
+    for u in prange(n_users):
+        acc = np.zeros(n_assets)
+        for m in range(n_months):
+            total = 0.0
+            for a in range(n_assets):
+                acc[a] = (acc[a] + contrib[u, m, a]) * growth[u, m, a]
+                total += acc[a]
+            totals[u, m] = total
+    return totals
+
+if HAVE_NUMBA:
+    _compound_kernel = njit(parallel=True, cache=True)(_compound_kernel)
+
+def simulate_investment_growth(contrib, growth):
+    """
+    Compound monthly contributions: value = (value + contrib) * growth, carried
+    across the month axis, and return the total over assets per (user, month).
+    contrib/growth are (users, months, assets); growth must be non-negative.
+    """
+    if HAVE_NUMBA:
+        return _compound_kernel(contrib, growth)
+    totals = np.empty(contrib.shape[:2])
+    value = np.zeros((contrib.shape[0], contrib.shape[2]))
+    for m in range(contrib.shape[1]):
+        value = (value + contrib[:, m]) * growth[:, m]
+        totals[:, m] = value.sum(axis=1)
+    return totals
+
+def generate_investment_chunk(df, seed):
+    rng = np.random.default_rng(seed)
+    n_users = len(df)
+    shape = (n_users, len(MONTHS))
+
+    surplus = np.maximum(0, df["monthly_surplus"].to_numpy(dtype=float))
+    discipline = df["user_archetype"].map(ARCHETYPE_DISCIPLINE).fillna(0.6).to_numpy()
+    alloc_table = pd.DataFrame(RISK_ALLOCATION).T[ASSETS]
+    risk_alloc = alloc_table.reindex(df["risk_tolerance"]).fillna(alloc_table.loc["Medium"]).to_numpy()
+
+    invest_base = (surplus * rng.uniform(0.20, 0.80, n_users) * discipline)[:, None]
+
+    skip_prob = rng.uniform(0.05, 0.30, shape)
+    month_invest = np.where(
+        rng.random(shape) < skip_prob,
+        invest_base * rng.uniform(0.0, 0.4, shape),
+        invest_base
+    )
+
+    # Per-asset contributions and growth over months: (users, months, assets)
+    contrib = month_invest[:, :, None] * risk_alloc[:, None, :]
+    # One growth draw for every (user, month, asset); clamping at zero keeps the
+    # compounded value non-negative, same as flooring it each month
+    growth = 1 + rng.normal(0.01, 0.03, contrib.shape)
+    np.maximum(growth, 0, out=growth)
+    total_value = simulate_investment_growth(contrib, growth)
+
+    return pd.DataFrame({
+        "user_id": np.repeat(df["user_id"].to_numpy(), len(MONTHS)),
+        "month": pd.Categorical.from_codes(np.tile(np.arange(len(MONTHS)), n_users), MONTHS, ordered=True),
+        "investment_monthly": np.round(month_invest, 2).ravel(),
+        **{asset: np.round(contrib[:, :, i], 2).ravel() for i, asset in enumerate(ASSETS)},
+        "skip_month": (month_invest < invest_base * 0.5).astype(int).ravel(),
+        "total_investment_value": np.round(total_value, 2).ravel()
+    })
 
 def generate_investment_data():
-    df = pd.read_csv(USER_PROFILE_FILE)
-
-    investment_records = []
+    df = load_csv(USER_PROFILE_FILE)
 
     print("\n==========================================")
     print(" ✅ Generating Investment & Savings Dataset")
     print("==========================================\n")
 
-    for _, user in tqdm(df.iterrows(), total=len(df)):
-        user_id = user["user_id"]
-        surplus = max(0, user["monthly_surplus"])
-        risk = user["risk_tolerance"]
-        archetype = user["user_archetype"]
-
-        discipline = ARCHETYPE_DISCIPLINE.get(archetype, 0.6)
-        risk_alloc = RISK_ALLOCATION.get(risk, RISK_ALLOCATION["Medium"])
-
-        invest_base = surplus * np.random.uniform(0.20, 0.80) * discipline
-
-        # track growing investments
-        stock_value = gold_bond_value = crypto_value = sip_value = 0
-
-        for month in MONTHS:
-            skip_prob = np.random.uniform(0.05, 0.30)
-
-            if np.random.rand() < skip_prob:
-                month_invest = invest_base * np.random.uniform(0.0, 0.4)
-            else:
-                month_invest = invest_base
-
-            stocks = month_invest * risk_alloc["stocks"]
-            sip = month_invest * risk_alloc["sip"]
-            crypto = month_invest * risk_alloc["crypto"]
-            gold_bonds = month_invest * risk_alloc["gold_bonds"]
-
-            # Apply growth over months
-            stock_value = simulate_investment_growth(stock_value + stocks)
-            sip_value = simulate_investment_growth(sip_value + sip)
-            crypto_value = simulate_investment_growth(crypto_value + crypto)
-            gold_bond_value = simulate_investment_growth(gold_bond_value + gold_bonds)
-
-            investment_records.append({
-                "user_id": user_id,
-                "month": month,
-                "investment_monthly": round(month_invest, 2),
-                "stocks": round(stocks, 2),
-                "sip": round(sip, 2),
-                "crypto": round(crypto, 2),
-                "gold_bonds": round(gold_bonds, 2),
-                "skip_month": int(month_invest < invest_base * 0.5),
-                "total_investment_value": round(
-                    stock_value + sip_value + crypto_value + gold_bond_value, 2
-                )
-            })
-
-    df_out = pd.DataFrame(investment_records)
-    df_out.to_csv(OUTPUT_FILE, index=False)
+    # Users are independent: chunks, each with its own spawned seed
+    chunks = [df.iloc[start:end] for start, end in chunk_bounds(len(df), MIN_CHUNK_USERS)]
+    results = run_chunks(generate_investment_chunk, chunks, SEED, return_as="generator")
+    # progress advances once per finished chunk rather than per row
+    parts = []
+    with tqdm(total=len(df), mininterval=0.5) as pbar:
+        for chunk, part in zip(chunks, results):
+            parts.append(part)
+            pbar.update(len(chunk))
+    df_out = pd.concat(parts, ignore_index=True)
+
+    pacsv.write_csv(pa.Table.from_pandas(df_out, preserve_index=False), OUTPUT_FILE)
 
     print("\n✅ Dataset Created Successfully!")
     print(f"Total rows: {len(df_out)}")
@@ -1,23 +1,25 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 from joblib import dump
+from data_cache import encode_categoricals, load_master_features
+from model_io import MODEL_COMPRESS
 
-df = pd.read_csv("finbuddy_master_features.csv", index_col=0)
+df = load_master_features(exclude=['user_archetype'])
 X = df.drop(columns=['progress_percent', 'user_archetype'], errors='ignore')
-y = (df['progress_percent'] > 0.7).astype(int)
+y = (df['progress_percent'] > 0.7).astype(np.int8)
 
-for col in X.select_dtypes(include=['object']).columns:
-    X[col] = X[col].astype('category').cat.codes
+X = encode_categoricals(X)
+X = X.astype(np.float32)
 
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42)
 
-model = RandomForestClassifier()
+model = HistGradientBoostingClassifier(max_iter=200, learning_rate=0.05, early_stopping=True)
 model.fit(X_train, y_train)
 
 preds = model.predict(X_test)
 acc = accuracy_score(y_test, preds)
 print(f"Life Event Detection Accuracy: {acc:.4f}")
-dump(model, "models/life_event_detection.pkl")
+dump(model, "models/life_event_detection.pkl", compress=MODEL_COMPRESS)
@@ -1,12 +1,14 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 from math import sqrt
 import joblib
+from data_cache import encode_categoricals, load_master_features
+from model_io import MODEL_COMPRESS
 
 def train():
-    df = pd.read_csv("finbuddy_master_features.csv", index_col=0)
+    df = load_master_features(exclude=['user_archetype'])
     target_col = 'merchant_insights'
 
     if target_col not in df.columns:
@@ -16,13 +18,13 @@ def train():
     X = df.drop(columns=[target_col, 'user_archetype'], errors='ignore')
     y = df[target_col]
 
-    for col in X.select_dtypes(include=['object']).columns:
-        X[col] = X[col].astype('category').cat.codes
+    X = encode_categoricals(X)
+    X = X.astype(np.float32)
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42)
 
-    model = RandomForestRegressor()
+    model = HistGradientBoostingRegressor(max_iter=200, learning_rate=0.05, early_stopping=True)
     model.fit(X_train, y_train)
 
     preds = model.predict(X_test)
@@ -30,7 +32,7 @@ def train():
     rmse = sqrt(mse)
     print(f"Merchant Behavior RMSE: {rmse:.4f}")
 
-    joblib.dump(model, "models/merchant_behavior.pkl")
+    joblib.dump(model, "models/merchant_behavior.pkl", compress=MODEL_COMPRESS)
 
 if __name__ == "__main__":
     train()
@@ -0,0 +1,7 @@
+# model_io.py
+# joblib.dump settings shared by the training scripts that write models/*.pkl.
+from importlib.util import find_spec
+
+# lz4 compresses faster than the disk writes; zlib is the fallback when the
+# optional lz4 package is missing. joblib.load handles either transparently.
+MODEL_COMPRESS = ("lz4", 3) if find_spec("lz4") else ("zlib", 3)
@@ -1,15 +1,25 @@
+import os
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-def run_script(script_name):
+def run_script(script_name, threads):
+    # Stream the child's output line by line (prefixed, since scripts run side by side)
+    # instead of buffering all of it until the script exits
     print(f"Running {script_name} ...")
-    ret = subprocess.run(["python", script_name], capture_output=True, text=True)
-    print(ret.stdout)
-    if ret.returncode != 0:
-        print(f"Error in {script_name}:")
-        print(ret.stderr)
-        exit(1)
+    # Each script would otherwise use every core (OpenMP in HistGradientBoosting / KMeans /
+    # LightGBM, loky pools for n_jobs=-1), so give each its share of the cores instead
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads), LOKY_MAX_CPU_COUNT=str(threads))
+    proc = subprocess.Popen(
+        [sys.executable, script_name], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env
+    )
+    for line in proc.stdout:
+        print(f"[{script_name}] {line}", end="")
+    return proc.wait()
 
 if __name__ == "__main__":
+    # Each script reads the prebuilt master features / user profiles and writes its
+    # own models/*.pkl, so none depends on another and they can all run at once
     scripts = [
         "future_spending.py",
         "category_forecast.py",
@@ -24,7 +34,15 @@ if __name__ == "__main__":
         "goal_achievement.py",
         "archetype_classifier.py"
     ]
-    for script in scripts:
-        run_script(script)
+    cores = os.cpu_count() or 1
+    max_workers = int(os.environ.get("FINBUDDY_TRAIN_WORKERS", min(len(scripts), 4, cores)))
+    threads = max(1, cores // max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        returncodes = dict(zip(scripts, executor.map(lambda s: run_script(s, threads), scripts)))
+
+    failed = [script for script, code in returncodes.items() if code != 0]
+    if failed:
+        print(f"Error in {', '.join(failed)}")
+        exit(1)
 
     print("All models trained successfully.")
@@ -0,0 +1,28 @@
+# parallel_chunks.py
+# Shared scaffold for the generators whose rows are independent: split the input into
+# chunks, give chunk i the i-th seed spawned from the run's seed, and run the chunks
+# in loky workers. Chunk boundaries depend only on the row count (never on the
+# machine), so for a given seed the output is the same however many cores run it.
+import math
+import os
+import numpy as np
+from joblib import Parallel, delayed
+
+CHUNKS_PER_RUN = 16  # enough to keep every core of a typical machine busy
+
+def chunk_bounds(n_rows, min_rows):
+    """[start, end) row ranges: CHUNKS_PER_RUN of them, but none shorter than min_rows."""
+    size = max(min_rows, math.ceil(n_rows / CHUNKS_PER_RUN), 1)
+    return [(start, min(start + size, n_rows)) for start in range(0, n_rows, size)]
+
+def run_chunks(func, chunks, seed, *extra, return_as="list"):
+    """
+    func(chunk, chunk_seed, *chunk_extra) for every chunk, one worker per core; a single
+    chunk runs in-process. `extra` are per-chunk argument lists zipped with `chunks`.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    n_jobs = max(1, min(len(chunks), os.cpu_count() or 1))
+    return Parallel(n_jobs=n_jobs, backend="loky", return_as=return_as)(
+        delayed(func)(chunk, chunk_seed, *chunk_extra)
+        for chunk, chunk_seed, *chunk_extra in zip(chunks, seeds, *extra)
+    )
@@ -1,30 +1,32 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 from math import sqrt
 import joblib
+from data_cache import encode_categoricals, load_master_features
+from model_io import MODEL_COMPRESS
 
 def train():
-    df = pd.read_csv("finbuddy_master_features.csv", index_col=0)
+    df = load_master_features(exclude=['user_archetype'])
 
     X = df.drop(columns=['composite_risk_score', 'user_archetype'], errors='ignore')
-    y = df['composite_risk_score']
+    y = df['composite_risk_score'].astype(np.float32)
 
-    for col in X.select_dtypes(include=['object']).columns:
-        X[col] = X[col].astype('category').cat.codes
+    X = encode_categoricals(X)
+    X = X.astype(np.float32)
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42)
 
-    model = RandomForestRegressor()
+    model = HistGradientBoostingRegressor(max_iter=200, learning_rate=0.05, early_stopping=True)
     model.fit(X_train, y_train)
 
     preds = model.predict(X_test)
     mse = mean_squared_error(y_test, preds)
     rmse = sqrt(mse)
     print(f"Risk Assessment RMSE: {rmse:.4f}")
-    joblib.dump(model, "models/risk_assessment.pkl")
+    joblib.dump(model, "models/risk_assessment.pkl", compress=MODEL_COMPRESS)
 
 if __name__ == "__main__":
     train()
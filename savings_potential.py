@@ -1,18 +1,21 @@
-import pandas as pd
+import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 from math import sqrt
 import joblib
+from data_cache import encode_categoricals, load_master_features
+from model_io import MODEL_COMPRESS
 
 def train():
-    df = pd.read_csv("finbuddy_master_features.csv", index_col=0)
+    df = load_master_features(exclude=['user_archetype'])
 
     X = df.drop(columns=['investment_amount', 'user_archetype'], errors='ignore')
-    y = df['investment_amount']
+    y = df['investment_amount'].astype(np.float32)
 
-    for col in X.select_dtypes(include=['object']).columns:
-        X[col] = X[col].astype('category').cat.codes
+    X = encode_categoricals(X)
+
+    X = X.astype({c: np.float32 for c in X.select_dtypes(include=['float']).columns})
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42)
@@ -24,7 +27,7 @@ def train():
     mse = mean_squared_error(y_test, preds)
     rmse = sqrt(mse)
     print(f"Savings Potential RMSE: {rmse:.4f}")
-    joblib.dump(model, "models/savings_potential.pkl")
+    joblib.dump(model, "models/savings_potential.pkl", compress=MODEL_COMPRESS)
 
 if __name__ == "__main__":
     train()
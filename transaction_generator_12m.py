@@ -2,35 +2,44 @@
 transaction_generator_12m.py
 Generates daily / transaction-level data for 12 months (May-2024 -> Apr-2025)
 Input:  monthly_expenses_12m.csv
-Output: transaction_data_12months.csv
+Output: transaction_data_12months.csv (or transaction_data_12months.parquet with OUTPUT_FORMAT = "parquet")
 
 Follows the reference TRANSACTION_MODEL and logic (flexible / strict modes,
 dirichlet splitting, date bias patterns, merchant/payment selection).
 """
 
-import csv
-import random
+import os
 import math
-from datetime import datetime
-from typing import List, Dict
+import calendar
+import tempfile
+from functools import lru_cache
+from typing import Dict
 import numpy as np
 import pandas as pd
-from scipy.stats import dirichlet
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tqdm import tqdm
+from parallel_chunks import chunk_bounds, run_chunks
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; split_amounts falls back to NumPy
+    HAVE_NUMBA = False
 
 # -------------------------
 # Configuration
 # -------------------------
 INPUT_FILE = "monthly_expenses_12m.csv"
 OUTPUT_FILE = "transaction_data_12months.csv"
+PARQUET_OUTPUT_FILE = "transaction_data_12months.parquet"
+# fraud_signals_12m.py, finbuddy_master_features.py and mysql_bulk_loader_fixed.py read the CSV
+OUTPUT_FORMAT = "csv"      # "csv" or "parquet"
 SEED = 42
 FLUSH_BATCH_USERS = 500    # flush transactions to disk every N input rows (users x months processed)
-LOG_EVERY = 500            # log progress every N input rows
+MIN_CHUNK_ROWS = 2000      # user-month rows per worker at least
 WRITE_HEADER = True
 
-if SEED is not None:
-    random.seed(SEED)
-    np.random.seed(SEED)
-
 # -------------------------
 # TRANSACTION MODEL (kept consistent with your reference)
 # -------------------------
@@ -177,194 +186,373 @@ TRANSACTION_MODEL: Dict[str, Dict] = {
 
 EXPENSE_CATEGORIES = list(TRANSACTION_MODEL.keys())
 
+# merchant names per category as object arrays, so a category's merchants are one fancy-index
+_MERCHANTS = {cat: np.array(cfg["merchants"], dtype=object) for cat, cfg in TRANSACTION_MODEL.items()}
+
+# payment methods and their cumulative probabilities per category, built once so a
+# whole category's methods come from one uniform draw + searchsorted
+_PAY_METHODS = {cat: np.array(list(cfg["payment_weights"].keys()), dtype=object)
+                for cat, cfg in TRANSACTION_MODEL.items()}
+_PAY_CDF = {}
+for _cat, _cfg in TRANSACTION_MODEL.items():
+    _w = np.array(list(_cfg["payment_weights"].values()), dtype=np.float64)
+    _PAY_CDF[_cat] = np.cumsum(_w / _w.sum())
+
 # -------------------------
 # Helper functions
 # -------------------------
-def generate_smart_transaction_amounts(total_amount: float, num_trans: int,
+@lru_cache(maxsize=256)
+def _alpha_vec(alpha: float, num_trans: int) -> np.ndarray:
+    # Dirichlet concentration vector; only ~12 alphas x small num_trans ever occur
+    return np.full(num_trans, alpha, dtype=np.float64)
+
+def _split_kernel(props, total_amount, floor_amount):
+    # floor_amount each plus a rounded props-share of what is left; the rounding
+    # remainder goes to the (first) largest amount so the split sums to total_amount
+    n = props.shape[0]
+    remaining = total_amount - n * floor_amount
+    out = np.empty(n, dtype=np.int64)
+    acc = 0
+    largest = 0
+    for i in range(n):
+        out[i] = floor_amount + np.int64(np.rint(props[i] * remaining))
+        acc += out[i]
+        if out[i] > out[largest]:
+            largest = i
+    out[largest] += total_amount - acc
+    return out
+
+if HAVE_NUMBA:
+    _split_kernel = njit(cache=True)(_split_kernel)
+
+def split_amounts(props: np.ndarray, total_amount: int, floor_amount: int) -> np.ndarray:
+    if HAVE_NUMBA:
+        return _split_kernel(props, total_amount, floor_amount)
+    out = floor_amount + np.rint(props * (total_amount - len(props) * floor_amount)).astype(np.int64)
+    out[np.argmax(out)] += total_amount - out.sum()
+    return out
+
+def generate_smart_transaction_amounts(rng: np.random.Generator, total_amount: float, num_trans: int,
                                        alpha: float, min_amount: float,
-                                       threshold: float) -> List[int]:
+                                       threshold: float) -> np.ndarray:
     """
     Produce integer transaction amounts summing to total_amount.
     Implements flexible (small totals) and strict modes per reference.
     """
     total_amount = int(round(total_amount))
     if total_amount <= 0:
-        return []
+        return np.empty(0, dtype=np.int64)
 
     if num_trans <= 1:
-        return [total_amount]
+        return np.array([total_amount], dtype=np.int64)
 
-    # Flexible mode
+    # Flexible mode: allow smaller than min_amount — split the whole total via Dirichlet
     if total_amount < threshold:
-        # allow smaller than min_amount — split via Dirichlet
-        props = dirichlet.rvs([alpha] * num_trans, size=1)[0]
-        amts = [int(round(p * total_amount)) for p in props]
-        diff = total_amount - sum(amts)
-        if diff != 0:
-            amts[amts.index(max(amts))] += diff
-        # remove zeros (if any) by merging into biggest
-        if any(a == 0 for a in amts):
-            # ensure at least 1 transaction gets something
-            for i, a in enumerate(amts):
-                if a == 0:
-                    amts[amts.index(max(amts))] += 0  # no-op but keep structure
-        return amts
+        return split_amounts(rng.dirichlet(_alpha_vec(alpha, num_trans)), total_amount, 0)
 
     # Strict mode: reserve min_amount per transaction
     min_total_needed = num_trans * min_amount
     if total_amount < min_total_needed:
         # reduce num_trans to feasible number
-        feasible = max(1, total_amount // min_amount)
-        if feasible == 0:
-            return [total_amount]
-        num_trans = feasible
-
-    reserved = num_trans * min_amount
-    remaining = total_amount - reserved
-    if remaining <= 0:
-        base = [min_amount] * num_trans
-        diff = total_amount - sum(base)
-        if diff != 0:
-            base[-1] += diff
+        num_trans = max(1, total_amount // min_amount)
+
+    if total_amount - num_trans * min_amount <= 0:
+        base = np.full(num_trans, min_amount, dtype=np.int64)
+        base[-1] += total_amount - base.sum()
         return base
 
-    props = dirichlet.rvs([alpha] * num_trans, size=1)[0]
-    extras = [int(round(p * remaining)) for p in props]
-    amounts = [min_amount + e for e in extras]
-    diff = total_amount - sum(amounts)
-    if diff != 0:
-        amounts[amounts.index(max(amounts))] += diff
-    return amounts
+    return split_amounts(rng.dirichlet(_alpha_vec(alpha, num_trans)), total_amount, min_amount)
 
+@lru_cache(maxsize=None)
 def get_days_in_month(year: int, month: int) -> int:
-    if month == 12:
-        return (datetime(year + 1, 1, 1) - datetime(year, month, 1)).days
-    return (datetime(year, month + 1, 1) - datetime(year, month, 1)).days
-
-def generate_dates_with_bias(year: int, month: int, num_trans: int,
-                             date_bias: str, config: dict) -> List[datetime]:
+    # only the 12 generated months are ever asked for, so this is a table lookup after warm-up
+    return calendar.monthrange(year, month)[1]
+
+@lru_cache(maxsize=64)
+def _day_pools(year: int, month: int):
+    """Weekend and weekday day numbers of a month, computed once per (year, month)."""
+    days = np.arange(1, get_days_in_month(year, month) + 1)
+    # weekmask marks Sat/Sun as the "business" days, i.e. flags weekends
+    is_weekend = np.is_busday(np.datetime64(f"{year:04d}-{month:02d}-01") + (days - 1), weekmask="0000011")
+    return days[is_weekend], days[~is_weekend]
+
+def _randint(u: np.ndarray, low: int, high: int) -> np.ndarray:
+    # maps uniform [0, 1) draws onto integers in [low, high]; cheaper than a
+    # Generator.integers call per small array
+    return low + (u * (high - low + 1)).astype(np.int64)
+
+def _draw_int(rng: np.random.Generator, low: int, high: int) -> int:
+    # one integer in [low, high]; a scalar Generator.random() is cheaper than Generator.integers()
+    return low + int(rng.random() * (high - low + 1))
+
+def _biased_days(pool: np.ndarray, share: float, u: np.ndarray, days_in_month: int) -> np.ndarray:
+    # `share` of the days come straight from `pool`, the rest uniform over the month
+    biased = int(len(u) * share)
+    return np.concatenate([pool[_randint(u[:biased], 0, len(pool) - 1)],
+                           _randint(u[biased:], 1, days_in_month)])
+
+def generate_dates_with_bias(rng: np.random.Generator, year: int, month: int, num_trans: int,
+                             date_bias: str, config: dict) -> np.ndarray:
+    """Sorted datetime64[m] timestamps for num_trans transactions in (year, month)."""
     days_in_month = get_days_in_month(year, month)
-    dates = []
     if num_trans <= 0:
-        return dates
-
-    if date_bias == "fixed" and "specific_days" in config:
-        available_days = [d for d in config["specific_days"] if d <= days_in_month]
-        # repeat available days if needed
-        chosen = []
-        while len(chosen) < num_trans:
-            chosen.extend(random.sample(available_days, k=min(len(available_days), num_trans - len(chosen))))
-            if not available_days:
-                break
-        for d in chosen[:num_trans]:
-            dates.append(datetime(year, month, d, random.randint(0, 23), random.randint(0, 59)))
+        return np.array([], dtype="datetime64[m]")
+
+    u_day, u_minute = rng.random((2, num_trans))
+    available_days = [d for d in config.get("specific_days", []) if d <= days_in_month]
+    if date_bias == "fixed" and available_days:
+        # every available day once (shuffled) before any day repeats
+        days = np.resize(rng.permutation(available_days), num_trans)
+        first_hour, last_hour = 0, 23
 
     elif date_bias == "early_month":
-        for _ in range(num_trans):
-            day = random.randint(1, min(10, days_in_month))
-            dates.append(datetime(year, month, day, random.randint(8, 20), random.randint(0, 59)))
+        days = _randint(u_day, 1, min(10, days_in_month))
+        first_hour, last_hour = 8, 20
 
     elif date_bias == "weekend":
-        # try to bias to weekends; fallback to random if cannot find enough
-        tries = 0
-        while len(dates) < num_trans and tries < num_trans * 5:
-            d = random.randint(1, days_in_month)
-            dt = datetime(year, month, d, random.randint(10, 21), random.randint(0, 59))
-            if dt.weekday() >= 5 or random.random() < 0.3:  # some probability to accept non-weekend
-                dates.append(dt)
-            tries += 1
-        while len(dates) < num_trans:
-            d = random.randint(1, days_in_month)
-            dates.append(datetime(year, month, d, random.randint(10, 21), random.randint(0, 59)))
+        days = _biased_days(_day_pools(year, month)[0], 0.7, u_day, days_in_month)
+        first_hour, last_hour = 10, 21
 
     elif date_bias == "weekday":
-        tries = 0
-        while len(dates) < num_trans and tries < num_trans * 5:
-            d = random.randint(1, days_in_month)
-            dt = datetime(year, month, d, random.randint(7, 20), random.randint(0, 59))
-            if dt.weekday() < 5 or random.random() < 0.2:
-                dates.append(dt)
-            tries += 1
-        while len(dates) < num_trans:
-            d = random.randint(1, days_in_month)
-            dates.append(datetime(year, month, d, random.randint(7, 20), random.randint(0, 59)))
+        days = _biased_days(_day_pools(year, month)[1], 0.8, u_day, days_in_month)
+        first_hour, last_hour = 7, 20
 
     elif date_bias == "mid_to_late_month":
-        for _ in range(num_trans):
-            day = random.randint(10, min(25, days_in_month))
-            dates.append(datetime(year, month, day, random.randint(11, 21), random.randint(0, 59)))
+        days = _randint(u_day, 10, min(25, days_in_month))
+        first_hour, last_hour = 11, 21
 
     else:  # uniform / random
-        for _ in range(num_trans):
-            day = random.randint(1, days_in_month)
-            dates.append(datetime(year, month, day, random.randint(6, 23), random.randint(0, 59)))
-
-    dates = sorted(dates)
-    return dates
+        days = _randint(u_day, 1, days_in_month)
+        first_hour, last_hour = 6, 23
 
-def select_payment_method(weights: dict) -> str:
-    methods = list(weights.keys())
-    probs = list(weights.values())
-    return random.choices(methods, weights=probs, k=1)[0]
+    # minute offset within the day: hour in [first_hour, last_hour], minute in [0, 59]
+    minutes = _randint(u_minute, first_hour * 60, last_hour * 60 + 59)
+    base = np.datetime64(f"{year:04d}-{month:02d}-01", "m")
+    dates = base + (days - 1).astype("timedelta64[D]") + minutes.astype("timedelta64[m]")
+    return np.sort(dates)
 
-def generate_transactions_for_category(user_id: str, month: int, year: int,
-                                       category: str, total_amount: float,
-                                       user_profile: dict) -> List[Dict]:
+def _make_category_generator(category: str):
     """
-    Returns list of transactions (dicts with date, amount, merchant, payment_method, is_online, category)
+    Bake one category's TRANSACTION_MODEL settings into a dedicated generator, so the
+    hot path does no config dict lookups. The generator returns the category's
+    transactions as columns (date, amount, merchant, description, payment_method,
+    is_online, category); "date" is a sorted datetime64[m] array, the rest are lists.
     """
-    if total_amount <= 0 or category not in TRANSACTION_MODEL:
-        return []
-
     cfg = TRANSACTION_MODEL[category]
     min_amt = cfg["min_transaction_amount"]
     threshold = cfg["allow_below_min_threshold"]
     min_trans, max_trans = cfg["trans_range"]
-
-    # determine num_trans based on total & archetype
-    if total_amount < threshold:
-        num_trans = random.randint(1, max(1, min_trans // 2))
-    else:
-        max_possible = max(1, int(total_amount // min_amt))
-        max_t = min(max_trans, max_possible)
-        min_t = min(min_trans, max_possible)
-        archetype = user_profile.get("user_archetype", "")
-        if archetype == "impulsive_spender":
-            num_trans = random.randint(min_t, min_t + max(0, (max_t - min_t) // 2))
-        elif archetype in ["meticulous_tracker", "balanced_planner"]:
-            num_trans = random.randint(min_t + max(0, (max_t - min_t) // 2), max_t)
+    alpha = cfg.get("dirichlet_alpha", 1.0)
+    date_bias = cfg.get("date_bias", "uniform")
+    merchants = _MERCHANTS[category]
+    methods = _PAY_METHODS[category]
+    pay_cdf = _PAY_CDF[category]
+    online_probability = cfg["online_probability"]
+    label = category.replace("_expense", "")
+    # "<merchant> - <category>" for every merchant, indexed like `merchants`
+    descriptions = np.array([f"{m} - {label}" for m in merchants], dtype=object)
+
+    def generate(rng: np.random.Generator, total_amount: float, archetype: str,
+                 year: int, month: int) -> Dict[str, list]:
+        # determine num_trans based on total & archetype
+        if total_amount < threshold:
+            num_trans = _draw_int(rng, 1, max(1, min_trans // 2))
         else:
-            num_trans = random.randint(min_t, max_t)
+            max_possible = max(1, int(total_amount // min_amt))
+            max_t = min(max_trans, max_possible)
+            min_t = min(min_trans, max_possible)
+            if archetype == "impulsive_spender":
+                num_trans = _draw_int(rng, min_t, min_t + max(0, (max_t - min_t) // 2))
+            elif archetype in ["meticulous_tracker", "balanced_planner"]:
+                num_trans = _draw_int(rng, min_t + max(0, (max_t - min_t) // 2), max_t)
+            else:
+                num_trans = _draw_int(rng, min_t, max_t)
+
+        num_trans = max(1, num_trans)
+
+        # get integer amounts
+        amounts = generate_smart_transaction_amounts(rng, total_amount, num_trans, alpha, min_amt, threshold)
+
+        # generate dates with bias (use year/month)
+        dates = generate_dates_with_bias(rng, year, month, len(amounts), date_bias, cfg)
+
+        # merchant / payment method / online flag for all transactions in one draw each
+        n = len(amounts)
+        u = rng.random((3, n))
+        merchant_idx = _randint(u[0], 0, merchants.size - 1)
+        method_idx = np.minimum(np.searchsorted(pay_cdf, u[1], side="right"), methods.size - 1)
+        online = (u[2] < online_probability).tolist()
+
+        return {
+            "date": dates,
+            "amount": amounts.tolist(),
+            "merchant": merchants[merchant_idx].tolist(),
+            "description": descriptions[merchant_idx].tolist(),
+            "payment_method": methods[method_idx].tolist(),
+            "is_online": online,
+            "category": label
+        }
 
-    num_trans = max(1, num_trans)
+    return generate
 
-    # get integer amounts
-    alpha = cfg.get("dirichlet_alpha", 1.0)
-    amounts = generate_smart_transaction_amounts(total_amount, num_trans, alpha, min_amt, threshold)
-
-    # generate dates with bias (use year/month)
-    dates = generate_dates_with_bias(year, month, len(amounts), cfg.get("date_bias", "uniform"), cfg)
-
-    transactions = []
-    for i, amt in enumerate(amounts):
-        merchant = random.choice(cfg["merchants"])
-        payment_method = select_payment_method(cfg["payment_weights"])
-        is_online = random.random() < cfg["online_probability"]
-        date_obj = dates[i] if i < len(dates) else dates[-1] if dates else datetime(year, month, 1, 12, 0)
-        transactions.append({
-            "date": date_obj,
-            "amount": int(amt),
-            "merchant": merchant,
-            "payment_method": payment_method,
-            "is_online": bool(is_online),
-            "category": category.replace("_expense", "")
-        })
-    return transactions
+_CATEGORY_GENERATORS = {cat: _make_category_generator(cat) for cat in EXPENSE_CATEGORIES}
+
+def generate_transactions_for_category(rng: np.random.Generator, user_id: str, month: int, year: int,
+                                       category: str, total_amount: float,
+                                       user_profile: dict) -> Dict[str, list]:
+    """
+    Returns the category's transactions as columns (date, amount, merchant, description,
+    payment_method, is_online, category); "date" is a sorted datetime64[m] array, the rest are lists
+    """
+    if total_amount <= 0 or category not in TRANSACTION_MODEL:
+        return {}
+    return _CATEGORY_GENERATORS[category](rng, total_amount, user_profile.get("user_archetype", ""), year, month)
+
+FIELDNAMES = ["transaction_id", "user_id", "date", "month_index", "category",
+              "merchant", "amount", "payment_method", "is_online", "description"]
+
+# Parquet part files hold every column but transaction_id, which is added when parts are stitched
+PART_SCHEMA = pa.schema([
+    ("user_id", pa.string()),
+    ("date", pa.timestamp("s")),
+    ("month_index", pa.int64()),
+    ("category", pa.string()),
+    ("merchant", pa.string()),
+    ("amount", pa.int64()),
+    ("payment_method", pa.string()),
+    ("is_online", pa.bool_()),
+    ("description", pa.string()),
+])
+PARQUET_SCHEMA = PART_SCHEMA.insert(0, pa.field("transaction_id", pa.string()))
+
+def write_transactions(writer, buffer: Dict[str, list]):
+    """
+    Append one batch of buffered columns to an open part file: a text handle (dates formatted
+    in one vectorized pass) or a pq.ParquetWriter (one row group per batch).
+    """
+    if not buffer["user_id"]:
+        return
+    # "date" holds one datetime64 array per category draw
+    dates = np.concatenate(buffer["date"])
+    if isinstance(writer, pq.ParquetWriter):
+        writer.write_table(pa.Table.from_pydict({**buffer, "date": dates.astype("datetime64[s]")}, schema=PART_SCHEMA))
+        return
+    batch = pd.DataFrame({**buffer, "date": pd.DatetimeIndex(dates).strftime("%Y-%m-%d %H:%M:%S")})
+    batch["is_online"] = batch["is_online"].astype(int)
+    batch.to_csv(writer, header=False, index=False, lineterminator="\n")
+
+def generate_transaction_chunk(df: pd.DataFrame, seed: np.random.SeedSequence, part_path: str,
+                               output_format: str = OUTPUT_FORMAT) -> Dict[str, int]:
+    """
+    Generate the transactions of a block of user-month rows into part_path, without the
+    transaction_id column (ids are assigned when the parts are stitched together).
+    """
+    # each chunk draws from its own seed, so output doesn't depend on how chunks are scheduled
+    rng = np.random.default_rng(seed)
+
+    stats = {"flexible": 0, "strict": 0, "tx_count": 0, "rows_processed": 0}
+    generators = [_CATEGORY_GENERATORS[cat] for cat in EXPENSE_CATEGORIES]
+    thresholds = [TRANSACTION_MODEL[cat]["allow_below_min_threshold"] for cat in EXPENSE_CATEGORIES]
+    # one list per output column; each flush turns them into a DataFrame in one go
+    columns = FIELDNAMES[1:]
+    buffer = {f: [] for f in columns}
+
+    # Pull every column the loop needs out as a plain array once, instead of
+    # building a pandas Series per row with iterrows()
+    n_rows = len(df)
+    user_ids = df["user_id"].astype(str).to_numpy()
+    month_indices = df["month_index"].to_numpy(dtype=np.int64)
+    archetypes = df["user_archetype"].to_numpy() if "user_archetype" in df.columns else np.full(n_rows, "")
+    # (rows, categories) totals with NaN as 0, plus the mask of categories that have any spend
+    totals = np.stack([np.nan_to_num(df[cat].to_numpy(dtype=np.float64)) for cat in EXPENSE_CATEGORIES], axis=1)
+    active = totals > 0
+
+    # month_start_date should exist (Option B mapping); rows where it doesn't parse
+    # fall back to month_index: 1->May2024, 2->Jun2024, ... 12->Apr2025
+    month_starts = pd.to_datetime(df["month_start_date"], format="%Y-%m-%d", errors="coerce").to_numpy(copy=True)
+    unparsed = np.isnat(month_starts)
+    if unparsed.any():
+        m_idx = month_indices[unparsed]
+        if ((m_idx < 1) | (m_idx > 12)).any():
+            raise ValueError("month_index out of range and month_start_date parse failed")
+        month_starts[unparsed] = np.datetime64("2024-05") + (m_idx - 1).astype("timedelta64[M]")
+    month_numbers = month_starts.astype("datetime64[M]").astype(np.int64)  # months since 1970-01
+    years = month_numbers // 12 + 1970
+    months = month_numbers % 12 + 1
+
+    if output_format == "parquet":
+        writer = pq.ParquetWriter(part_path, PART_SCHEMA)
+    else:
+        writer = open(part_path, "w", newline='', encoding='utf-8', buffering=1 << 20)
+    try:
+        # iterate rows (each row is user-month)
+        for idx in range(n_rows):
+            year = int(years[idx])
+            monthnum = int(months[idx])
+
+            user_id = user_ids[idx]
+            archetype = archetypes[idx]
+
+            # iterate the expense categories with spend and create transactions
+            for c in np.flatnonzero(active[idx]).tolist():
+                total_amount = float(totals[idx, c])
+
+                # compute transactions for this category
+                tx = generators[c](rng, total_amount, archetype, year, monthnum)
+
+                # classification flexible vs strict (for stats)
+                if total_amount < thresholds[c]:
+                    stats["flexible"] += 1
+                else:
+                    stats["strict"] += 1
+
+                n = len(tx["amount"])
+                buffer["user_id"].extend([user_id] * n)
+                buffer["date"].append(tx["date"])
+                buffer["month_index"].extend([month_indices[idx]] * n)
+                buffer["category"].extend([tx["category"]] * n)
+                buffer["merchant"].extend(tx["merchant"])
+                buffer["amount"].extend(tx["amount"])
+                buffer["payment_method"].extend(tx["payment_method"])
+                buffer["is_online"].extend(tx["is_online"])
+                buffer["description"].extend(tx["description"])
+                stats["tx_count"] += n
+
+            stats["rows_processed"] += 1
+
+            # flush buffer to the part file periodically to avoid large memory use
+            if stats["rows_processed"] % FLUSH_BATCH_USERS == 0:
+                write_transactions(writer, buffer)
+                buffer = {f: [] for f in columns}
+
+        write_transactions(writer, buffer)
+    finally:
+        writer.close()
+    return stats
+
+def append_part(fout, part_path: str, first_id: int) -> int:
+    """Copy a part file into the output, prefixing each row with its transaction_id; returns the next id."""
+    next_id = first_id
+    if isinstance(fout, pq.ParquetWriter):
+        for batch in pq.ParquetFile(part_path).iter_batches():
+            ids = pa.array([f"TXN-{i:08d}" for i in range(next_id, next_id + batch.num_rows)], pa.string())
+            fout.write_table(pa.Table.from_arrays([ids, *batch.columns], schema=PARQUET_SCHEMA))
+            next_id += batch.num_rows
+        return next_id
+    with open(part_path, encoding='utf-8', newline='') as fin:
+        while True:
+            lines = fin.readlines(1 << 24)
+            if not lines:
+                break
+            fout.write("".join([f"TXN-{i:08d},{line}" for i, line in enumerate(lines, next_id)]))
+            next_id += len(lines)
+    return next_id
 
 # -------------------------
 # Main streaming generation
 # -------------------------
-def generate_all_transactions_stream(input_csv: str = INPUT_FILE, output_csv: str = OUTPUT_FILE):
+def generate_all_transactions_stream(input_csv: str = INPUT_FILE, output_path: str = OUTPUT_FILE,
+                                     output_format: str = OUTPUT_FORMAT):
     # Read monthly file
     df = pd.read_csv(input_csv, dtype={"user_id": object})
     required_cols = {"user_id", "month_index", "month_start_date"}.union(set(EXPENSE_CATEGORIES))
@@ -372,98 +560,36 @@ def generate_all_transactions_stream(input_csv: str = INPUT_FILE, output_csv: st
     if missing:
         raise KeyError(f"Missing required columns in monthly CSV: {missing}")
 
-    # open writer
-    fieldnames = ["transaction_id", "user_id", "date", "month_index", "category",
-                  "merchant", "amount", "payment_method", "is_online", "description"]
-    # write header once
-    with open(output_csv, "w", newline='', encoding='utf-8') as fout:
-        writer = csv.DictWriter(fout, fieldnames=fieldnames)
-        writer.writeheader()
-
-    transaction_counter = 1
+    # User-month rows are independent: chunks, each with its own spawned seed, are
+    # generated into part files next to the output (same disk) and then stitched
+    # together in order
+    chunks = [df.iloc[start:end] for start, end in chunk_bounds(len(df), MIN_CHUNK_ROWS)]
     stats = {"flexible": 0, "strict": 0, "tx_count": 0, "rows_processed": 0}
-    buffer_rows = []
 
-    # iterate rows (each row is user-month)
-    for idx, row in df.iterrows():
-        # month_start_date should exist (Option B mapping)
-        try:
-            month_start = datetime.strptime(str(row["month_start_date"]), "%Y-%m-%d")
-        except Exception:
-            # fallback: infer year/month from month_index mapping: month_index 1 -> May 2024 etc
-            # map month_index (1..12) -> months May-2024 .. Apr-2025
-            m_idx = int(row["month_index"])
-            # mapping: 1->May2024, 2->Jun2024, ... 12->Apr2025
-            month_order = [ (2024,5), (2024,6), (2024,7), (2024,8), (2024,9), (2024,10),
-                            (2024,11),(2024,12),(2025,1),(2025,2),(2025,3),(2025,4) ]
-            if 1 <= m_idx <= 12:
-                year, monthnum = month_order[m_idx - 1]
-                month_start = datetime(year, monthnum, 1)
-            else:
-                raise ValueError("month_index out of range and month_start_date parse failed")
-
-        year = month_start.year
-        monthnum = month_start.month
-
-        user_id = str(row["user_id"])
-        user_profile = {
-            "user_archetype": row.get("user_archetype", ""),
-            "risk_tolerance": row.get("risk_tolerance", None),
-            "is_metro": row.get("is_metro", None)
-        }
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as part_dir:
+        parts = [os.path.join(part_dir, f"part_{i:05d}.{output_format}") for i in range(len(chunks))]
+        results = run_chunks(
+            generate_transaction_chunk, chunks, SEED, parts, [output_format] * len(chunks), return_as="generator"
+        )
 
-        # iterate expense categories and create transactions
-        for cat in EXPENSE_CATEGORIES:
-            total_amount = float(row.get(cat, 0) if not pd.isna(row.get(cat, 0)) else 0)
-            if total_amount <= 0:
-                continue
-
-            # compute transactions for this category
-            trans_list = generate_transactions_for_category(user_id, monthnum, year, cat, total_amount, user_profile)
-
-            # classification flexible vs strict (for stats)
-            threshold = TRANSACTION_MODEL[cat]["allow_below_min_threshold"]
-            if total_amount < threshold:
-                stats["flexible"] += 1
-            else:
-                stats["strict"] += 1
-
-            for t in trans_list:
-                out_row = {
-                    "transaction_id": f"TXN-{transaction_counter:08d}",
-                    "user_id": user_id,
-                    "date": t["date"].strftime("%Y-%m-%d %H:%M:%S"),
-                    "month_index": int(row["month_index"]),
-                    "category": t["category"],
-                    "merchant": t["merchant"],
-                    "amount": int(t["amount"]),
-                    "payment_method": t["payment_method"],
-                    "is_online": int(t["is_online"]),
-                    "description": f"{t['merchant']} - {t['category']}"
-                }
-                buffer_rows.append(out_row)
-                transaction_counter += 1
-                stats["tx_count"] += 1
-
-        stats["rows_processed"] += 1
-
-        # flush buffer to CSV periodically to avoid large memory use
-        if stats["rows_processed"] % FLUSH_BATCH_USERS == 0 or idx == len(df) - 1:
-            with open(output_csv, "a", newline='', encoding='utf-8') as fout:
-                writer = csv.DictWriter(fout, fieldnames=fieldnames)
-                writer.writerows(buffer_rows)
-            buffer_rows = []
-
-        # progress logging
-        if stats["rows_processed"] % LOG_EVERY == 0:
-            print(f"Processed rows (user-months): {stats['rows_processed']}/{len(df)}  | Transactions so far: {stats['tx_count']:,}")
-
-    # final flush (if any)
-    if buffer_rows:
-        with open(output_csv, "a", newline='', encoding='utf-8') as fout:
-            writer = csv.DictWriter(fout, fieldnames=fieldnames)
-            writer.writerows(buffer_rows)
-        buffer_rows = []
+        # the output stays open for the whole run (CSV: 1 MiB buffer, header first)
+        if output_format == "parquet":
+            fout = pq.ParquetWriter(output_path, PARQUET_SCHEMA)
+        else:
+            fout = open(output_path, "w", newline='', encoding='utf-8', buffering=1 << 20)
+            fout.write(",".join(FIELDNAMES) + "\n")
+        try:
+            next_id = 1
+            # progress advances once per finished chunk rather than per row
+            with tqdm(total=len(df), mininterval=0.5) as pbar:
+                for chunk, part, chunk_stats in zip(chunks, parts, results):
+                    next_id = append_part(fout, part, next_id)
+                    os.remove(part)
+                    for key in stats:
+                        stats[key] += chunk_stats[key]
+                    pbar.update(len(chunk))
+        finally:
+            fout.close()
 
     # Print summary
     print("\n=== GENERATION COMPLETE ===")
@@ -471,7 +597,7 @@ def generate_all_transactions_stream(input_csv: str = INPUT_FILE, output_csv: st
     print(f"Total transactions generated: {stats['tx_count']:,}")
     print(f"Flexible-mode categories: {stats['flexible']}")
     print(f"Strict-mode categories: {stats['strict']}")
-    print(f"Output CSV: {output_csv}")
+    print(f"Output {output_format.upper()}: {output_path}")
     return
 
 # -------------------------
@@ -481,4 +607,6 @@ if __name__ == "__main__":
     print("=" * 60)
     print("Transaction generator (12 months) - Option B mapping (May 2024 -> Apr 2025)")
     print("=" * 60)
-    generate_all_transactions_stream(INPUT_FILE, OUTPUT_FILE)
+    generate_all_transactions_stream(
+        INPUT_FILE, PARQUET_OUTPUT_FILE if OUTPUT_FORMAT == "parquet" else OUTPUT_FILE, OUTPUT_FORMAT
+    )
@@ -4,23 +4,50 @@
 
 import numpy as np
 import pandas as pd
-import random
-from scipy import stats
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from parallel_chunks import chunk_bounds, run_chunks
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; _spend_allocation falls back to NumPy
+    HAVE_NUMBA = False
+    prange = range
+
+MIN_SHARD_USERS = 50000  # per worker; generating 10k profiles takes less than starting one
+
+def _fixup_kernel(alloc, target):
+    # per row: add the rounding residual to the (first) largest category, in place
+    n, k = alloc.shape
+    for i in prange(n):
+        acc = 0
+        largest = 0
+        for j in range(k):
+            acc += alloc[i, j]
+            if alloc[i, j] > alloc[i, largest]:
+                largest = j
+        alloc[i, largest] += target[i] - acc
+
+if HAVE_NUMBA:
+    _fixup_kernel = njit(parallel=True, cache=True)(_fixup_kernel)
 
 class FullUserProfileGeneratorV3:
-    def __init__(self, num_users=10000, save_path="users_profile_full_v3.csv", seed=42):
+    def __init__(self, num_users=10000, save_path="users_profile_full_v3.csv", seed=42, save_format="csv"):
         self.num_users = num_users
         self.save_path = save_path
+        # "csv" (what data_cache.load_users and the MySQL loader read) or "parquet" (zstd)
+        self.save_format = save_format
         self.seed = seed
-        np.random.seed(self.seed)
-        random.seed(self.seed)
+        self.rng = np.random.default_rng(self.seed)
 
         # Age distribution parameters will be used to draw ages in the 16-65 range
         self.age_loc = 28
         self.age_scale = 10
 
-        # Income base distribution (log-normal) - we'll multiply by education/age multipliers
-        self.base_income_dist = stats.lognorm(s=0.9, scale=30000)
+        # Income base distribution (log-normal, median 30000) - we'll multiply by education/age multipliers
+        self.base_income_sigma = 0.9
+        self.base_income_median = 30000
 
         # Archetypes (for behavioral realism)
         self.archetypes = [
@@ -33,6 +60,30 @@ class FullUserProfileGeneratorV3:
 
         # Education levels - ordered (lowest -> highest)
         self.education_levels = ["high_school", "bachelors", "masters", "professional", "phd"]
+        # Cumulative education probabilities per age bin (bins end at these ages, inclusive)
+        self.education_age_bins = np.array([17, 22, 26, 35, 50, 65])
+        self.education_cdf = np.cumsum([
+            [1.00, 0.00, 0.00, 0.00, 0.00],  # 16-17
+            [0.15, 0.85, 0.00, 0.00, 0.00],  # 18-22
+            [0.00, 0.65, 0.25, 0.10, 0.00],  # 23-26
+            [0.00, 0.40, 0.40, 0.20, 0.00],  # 27-35
+            [0.00, 0.35, 0.40, 0.20, 0.05],  # 36-50
+            [0.00, 0.45, 0.35, 0.15, 0.05],  # 51-65
+        ], axis=1)
+        # Typical finishing (graduation) age per education level, same order:
+        # high_school 17-18, bachelors ~21-23, masters ~23-25, professional ~25-28, phd ~28-35
+        self.graduation_ages = np.array([17, 22, 24, 26, 30])
+        # Income multiplier per education level (higher education -> higher income)
+        self.education_income_mult = np.array([0.65, 1.0, 1.25, 1.45, 1.6])
+        # Probability of being a current student per (education code, age):
+        # - high chance for high_school (<=19) and bachelors (<=23), some for bachelors 24-27
+        # - lower chance for masters (22-30) and PhD (25-40) students
+        self.student_prob = np.zeros((len(self.education_levels), 66))
+        self.student_prob[0, :20] = 0.7
+        self.student_prob[1, :24] = 0.75
+        self.student_prob[1, 24:28] = 0.2
+        self.student_prob[2, 22:31] = 0.35
+        self.student_prob[4, 25:41] = 0.30
 
         # Communication / behavior options
         self.money_approach = ['meticulous_tracker', 'rough_idea', 'struggle_control', 'avoidant']
@@ -45,12 +96,19 @@ class FullUserProfileGeneratorV3:
         self.metro_cities = ['Mumbai','Delhi','Bangalore','Hyderabad','Chennai','Pune']
         self.non_metro_cities = ['Ahmedabad','Surat','Jaipur','Lucknow','Nagpur','Kochi','Indore']
 
-    def _draw_age(self):
-        """Draw an age between 16 and 65 with a center around young adults."""
+        # Expense split per (archetype, age bucket <=25 / 26-49 / >=50), computed once
+        bucket_ages = [25, 30, 50]
+        self.expense_categories = self._split_proportions(self.archetypes[0], bucket_ages[0])[0]
+        self.split_matrix = np.array([
+            [self._split_proportions(archetype, age)[1] for age in bucket_ages]
+            for archetype in self.archetypes
+        ])
+
+    def _draw_age(self, n):
+        """Draw n ages between 16 and 65 with a center around young adults."""
         # Use a rounded normal with clipping
-        age = int(round(np.random.normal(loc=self.age_loc, scale=self.age_scale)))
-        age = max(16, min(65, age))
-        return age
+        age = np.round(self.rng.normal(loc=self.age_loc, scale=self.age_scale, size=n))
+        return np.clip(age, 16, 65).astype(int)
 
     def _assign_education_by_age(self, age):
         """
@@ -60,88 +118,29 @@ class FullUserProfileGeneratorV3:
         - 23-26  : bachelors / masters / early professionals
         - 27-35  : bachelors/masters/professional
         - 36+    : professional / masters / some phd
+        Returns codes into self.education_levels: one uniform draw per user, looked up
+        in the cumulative probabilities of that user's age bin (searchsorted, row-wise).
         """
-        if age <= 17:
-            return "high_school"
-        elif 18 <= age <= 22:
-            # Many will be bachelors students or recent grads
-            return np.random.choice(["high_school","bachelors"], p=[0.15, 0.85])
-        elif 23 <= age <= 26:
-            return np.random.choice(["bachelors","masters","professional"], p=[0.65,0.25,0.10])
-        elif 27 <= age <= 35:
-            return np.random.choice(["bachelors","masters","professional"], p=[0.40,0.40,0.20])
-        elif 36 <= age <= 50:
-            return np.random.choice(["bachelors","masters","professional","phd"], p=[0.35,0.40,0.20,0.05])
-        else:
-            # 51-65
-            return np.random.choice(["bachelors","masters","professional","phd"], p=[0.45,0.35,0.15,0.05])
+        cdf = self.education_cdf[np.searchsorted(self.education_age_bins, age)]
+        u = self.rng.random(len(age))
+        return np.minimum((cdf <= u[:, None]).sum(axis=1), len(self.education_levels) - 1)
 
-    def _is_current_student(self, age, education):
-        """
-        Determine is_student realistically:
-        - High chance if age between 16-24 and education indicates 'bachelors' or 'high_school'
-        - Lower chance for masters/PhD students in typical age ranges
-        """
-        if education == "high_school":
-            return np.random.choice([True, False], p=[0.7, 0.3]) if age <= 19 else False
-        if education == "bachelors":
-            # most 18-24 with bachelors are still students or recent grads
-            if age <= 23:
-                return np.random.choice([True, False], p=[0.75, 0.25])
-            elif 24 <= age <= 27:
-                return np.random.choice([True, False], p=[0.2, 0.8])
-            else:
-                return False
-        if education == "masters":
-            # masters students often are 22-30
-            if 22 <= age <= 30:
-                return np.random.choice([True, False], p=[0.35, 0.65])
-            else:
-                return False
-        if education == "professional":
-            return False
-        if education == "phd":
-            # PhD students sometimes in 25-35
-            if 25 <= age <= 40:
-                return np.random.choice([True, False], p=[0.30, 0.70])
-            return False
-        return False
-
-    def _graduation_age(self, education):
-        """
-        Typical finishing (graduation) ages per education:
-         - high_school: 17-18
-         - bachelors: ~21-23
-         - masters: ~23-25
-         - professional: ~25-28
-         - phd: ~28-35
-        """
-        if education == "high_school":
-            return 17
-        if education == "bachelors":
-            return 22
-        if education == "masters":
-            return 24
-        if education == "professional":
-            return 26
-        if education == "phd":
-            return 30
-        return 22
-
-    def _years_experience(self, age, is_student, education):
+    def _is_current_student(self, age, edu_code):
+        """Determine is_student realistically, from the per-(education, age) probability table."""
+        return self.rng.random(len(age)) < self.student_prob[edu_code, age]
+
+    def _years_experience(self, age, is_student, edu_code):
         """Estimate years of professional experience consistent with education & student status."""
-        if is_student:
-            return 0
-        grad_age = self._graduation_age(education)
+        grad_age = self.graduation_ages[edu_code]
         # some people start working before finishing degree; allow small positive experience if age > grad_age
-        possible_years = max(0, age - grad_age)
+        possible_years = np.maximum(0, age - grad_age)
         # add some variation but keep sensible
-        years = int(max(0, np.random.poisson(lam=max(0.5, possible_years * 0.6))))
+        years = self.rng.poisson(lam=np.maximum(0.5, possible_years * 0.6))
         # cap it reasonably
-        years = min(years, age - 16)
-        return years
+        years = np.minimum(years, age - 16)
+        return np.where(is_student, 0, years)
 
-    def _monthly_income(self, age, education, years_experience, is_student, city_is_metro):
+    def _monthly_income(self, age, edu_code, years_experience, is_student, city_is_metro):
         """
         Generate monthly income with dependence on:
         - education (higher education -> higher multiplier)
@@ -149,37 +148,33 @@ class FullUserProfileGeneratorV3:
         - student -> low income probability (internships / part-time)
         - metro -> higher income multiplier
         """
+        n = len(age)
         # base draw
-        base = int(self.base_income_dist.rvs())
+        base = self.rng.lognormal(
+            mean=np.log(self.base_income_median), sigma=self.base_income_sigma, size=n
+        ).astype(int)
 
         # education multiplier
-        edu_multiplier = {
-            "high_school": 0.65,
-            "bachelors": 1.0,
-            "masters": 1.25,
-            "professional": 1.45,
-            "phd": 1.6
-        }[education]
+        edu_multiplier = self.education_income_mult[edu_code]
 
         # experience factor
         exp_factor = 1 + (years_experience * 0.05)
 
         # student discount
-        student_factor = 0.35 if is_student else 1.0
+        student_factor = np.where(is_student, 0.35, 1.0)
 
         # metro uplift
-        metro_factor = 1.25 if city_is_metro else 1.0
+        metro_factor = np.where(city_is_metro, 1.25, 1.0)
 
-        income = int(max(5000, base * edu_multiplier * exp_factor * student_factor * metro_factor))
+        income = np.maximum(5000, base * edu_multiplier * exp_factor * student_factor * metro_factor).astype(int)
         # add some noise
-        income = int(income * np.random.uniform(0.85, 1.15))
-        return income
+        return (income * self.rng.uniform(0.85, 1.15, n)).astype(int)
 
-    def _spend_allocation(self, monthly_expenses, archetype, age):
+    def _split_proportions(self, archetype, age):
         """
-        Allocate monthly expenses into categories.
+        Proportions of monthly expenses per category.
         We slightly adjust proportions by archetype & age group.
-        Returns dict with category amounts summing (approximately) to monthly_expenses.
+        Returns (category names, proportions summing to 1).
         """
         # baseline split
         split = {
@@ -229,116 +224,120 @@ class FullUserProfileGeneratorV3:
         keys = [k for k in split.keys() if k.endswith('_expense')]
         vals = np.array([split[k] for k in keys], dtype=float)
         vals = vals / vals.sum()
+        return keys, vals
 
-        alloc = {k: int(round(v * monthly_expenses)) for k, v in zip(keys, vals)}
-
-        # small correction to ensure sum matches monthly_expenses (due to rounding)
-        diff = monthly_expenses - sum(alloc.values())
-        if diff != 0:
-            # add diff to the largest category
-            largest = max(alloc, key=alloc.get)
-            alloc[largest] += diff
-
+    def _spend_allocation(self, monthly_expenses, arch_code, age):
+        """
+        Allocate monthly expenses into categories with the precomputed split matrix.
+        Returns an (n, n_categories) int array; each row sums to monthly_expenses.
+        """
+        age_bucket = np.select([age <= 25, age >= 50], [0, 2], default=1)
+        alloc = np.rint(self.split_matrix[arch_code, age_bucket] * monthly_expenses[:, None]).astype(np.int64)
+
+        # small correction to ensure sum matches monthly_expenses (due to rounding):
+        # add diff to the (first) largest category
+        if HAVE_NUMBA:
+            _fixup_kernel(alloc, monthly_expenses.astype(np.int64))
+            return alloc
+        diff = monthly_expenses - alloc.sum(axis=1)
+        alloc[np.arange(len(alloc)), alloc.argmax(axis=1)] += diff
         return alloc
 
     def _yes_no(self, cond):
-        return "Yes" if cond else "No"
+        return pd.Categorical.from_codes(cond.astype(np.int8), categories=["No", "Yes"])
+
+    def _generate_shard(self, bounds, seed):
+        """Profiles for user_ids [start, end) from their own seed; each attribute is drawn for all of them at once."""
+        start, end = bounds
+        self.rng = np.random.default_rng(seed)
+        n = end - start
+        age = self._draw_age(n)
+        edu_code = self._assign_education_by_age(age)
+        education = pd.Categorical.from_codes(edu_code, categories=self.education_levels)
+        is_student = self._is_current_student(age, edu_code)
+        # choose city (codes into metro_cities + non_metro_cities)
+        cities = self.metro_cities + self.non_metro_cities
+        city_code = self.rng.integers(0, len(cities), n)
+        is_metro = city_code < len(self.metro_cities)
+
+        # years experience and income depend on education and student flag
+        years_experience = self._years_experience(age, is_student, edu_code)
+        monthly_income = self._monthly_income(age, edu_code, years_experience, is_student, is_metro)
+
+        # expense ratio depends on age/archetype; pick archetype
+        arch_code = self.rng.integers(0, len(self.archetypes), n)
+        # younger / students often spend higher share; older often save more (modest effect)
+        expense_ratio = np.select(
+            [is_student, age <= 25, age <= 35],
+            [
+                np.clip(self.rng.normal(0.85, 0.06, n), 0.6, 0.98),
+                np.clip(self.rng.normal(0.78, 0.08, n), 0.5, 0.98),
+                np.clip(self.rng.normal(0.72, 0.08, n), 0.45, 0.95),
+            ],
+            default=np.clip(self.rng.normal(0.68, 0.08, n), 0.35, 0.95)
+        )
+
+        monthly_expenses = np.maximum(0, monthly_income * expense_ratio).astype(int)
+        monthly_surplus = monthly_income - monthly_expenses
+        with np.errstate(divide="ignore", invalid="ignore"):
+            savings_rate = np.round(np.where(monthly_income > 0, monthly_surplus / monthly_income, 0.0), 3)
+
+        has_investments = (monthly_surplus > 2500) & (self.rng.random(n) < 0.6)
+        investment_amount = np.where(
+            has_investments, np.round(monthly_surplus * self.rng.uniform(0.1, 0.4, n)), 0
+        ).astype(int)
+        debt_to_income = np.round(self.rng.uniform(0.05, 0.6, n), 2)
+
+        # create spending allocation
+        allocation = self._spend_allocation(monthly_expenses, arch_code, age)
+
+        # integer columns are int32 (ample for rupee amounts and ids) and every value
+        # is non-negative by construction; string and Yes/No columns are categoricals
+        # built from codes, so no per-row Python string objects are created
+        def choice_column(options):
+            return pd.Categorical.from_codes(self.rng.integers(0, len(options), n), categories=options)
+
+        df = pd.DataFrame({
+            "user_id": np.arange(start, end, dtype=np.int32),
+            "age": age.astype(np.int32),
+            "month": None,
+            "monthly_income": monthly_income.astype(np.int32),
+            "education": education,
+            "city": pd.Categorical.from_codes(city_code, categories=cities),
+            "is_metro": self._yes_no(is_metro),
+            "dependents": np.where(is_student, 0, self.rng.integers(0, 3, n)).astype(np.int32),
+            "years_experience": years_experience.astype(np.int32),
+            "is_student": self._yes_no(is_student),
+            "risk_tolerance": np.round(np.clip(self.rng.normal(3.0, 0.8, n), 1.0, 5.0), 1),
+            "monthly_expenses": monthly_expenses.astype(np.int32),
+            # category spends:
+            **{c: allocation[:, i].astype(np.int32) for i, c in enumerate(self.expense_categories)},
+            "monthly_surplus": monthly_surplus.astype(np.int32),
+            "savings_rate": savings_rate,
+            "investment_amount": investment_amount.astype(np.int32),
+            "has_investments": self._yes_no(has_investments),
+            "technology_comfort": np.round(np.clip(6 - (age / 16.0), 1.0, 5.0), 1),
+            "money_management_approach": choice_column(self.money_approach),
+            "decision_making_style": choice_column(self.decision_style),
+            "goal_setting_behavior": choice_column(self.goal_style),
+            "preferred_communication": choice_column(self.communication_pref),
+            "information_processing": choice_column(self.info_processing),
+            "user_archetype": pd.Categorical.from_codes(arch_code, categories=self.archetypes),
+            "debt_to_income": debt_to_income
+        })
+        return df
 
     def generate(self):
-        records = []
-        for uid in range(self.num_users):
-            age = self._draw_age()
-            education = self._assign_education_by_age(age)
-            is_student_bool = self._is_current_student(age, education)
-            # choose city
-            city = (np.random.choice(self.metro_cities + self.non_metro_cities))
-            is_metro_bool = city in self.metro_cities
-
-            # years experience and income depend on education and student flag
-            years_experience = self._years_experience(age, is_student_bool, education)
-            monthly_income = self._monthly_income(age, education, years_experience, is_student_bool, is_metro_bool)
-
-            # expense ratio depends on age/archetype; pick archetype
-            archetype = np.random.choice(self.archetypes)
-            # younger / students often spend higher share; older often save more (modest effect)
-            if is_student_bool:
-                expense_ratio = np.clip(np.random.normal(0.85, 0.06), 0.6, 0.98)
-            elif age <= 25:
-                expense_ratio = np.clip(np.random.normal(0.78, 0.08), 0.5, 0.98)
-            elif age <= 35:
-                expense_ratio = np.clip(np.random.normal(0.72, 0.08), 0.45, 0.95)
-            else:
-                expense_ratio = np.clip(np.random.normal(0.68, 0.08), 0.35, 0.95)
-
-            monthly_expenses = int(max(0, monthly_income * expense_ratio))
-            monthly_surplus = monthly_income - monthly_expenses
-            savings_rate = round(monthly_surplus / monthly_income if monthly_income > 0 else 0.0, 3)
-
-            has_investments = bool((monthly_surplus > 2500) and (np.random.random() < 0.6))
-            investment_amount = int(round(monthly_surplus * np.random.uniform(0.1, 0.4))) if has_investments else 0
-            debt_to_income = round(np.random.uniform(0.05, 0.6), 2)
-
-            # create spending allocation
-            allocation = self._spend_allocation(monthly_expenses, archetype, age)
-
-            rec = {
-                "user_id": uid,
-                "age": age,
-                "month": None,
-                "monthly_income": monthly_income,
-                "education": education,
-                "city": city,
-                "is_metro": self._yes_no(is_metro_bool),
-                "dependents": 0 if is_student_bool else np.random.randint(0, 3),
-                "years_experience": years_experience,
-                "is_student": self._yes_no(is_student_bool),
-                "risk_tolerance": round(np.clip(np.random.normal(3.0, 0.8), 1.0, 5.0), 1),
-                "monthly_expenses": monthly_expenses,
-                # category spends:
-                "food_expense": allocation.get('food_expense', 0),
-                "groceries_expense": allocation.get('groceries_expense', 0),
-                "education_expense": allocation.get('education_expense', 0),
-                "subscriptions_expense": allocation.get('subscriptions_expense', 0),
-                "fuel_expense": allocation.get('fuel_expense', 0),
-                "transportation_expense": allocation.get('transportation_expense', 0),
-                "utilities_expense": allocation.get('utilities_expense', 0),
-                "entertainment_expense": allocation.get('entertainment_expense', 0),
-                "shopping_expense": allocation.get('shopping_expense', 0),
-                "healthcare_expense": allocation.get('healthcare_expense', 0),
-                "personal_care_expense": allocation.get('personal_care_expense', 0),
-                "miscellaneous_expense": allocation.get('miscellaneous_expense', 0),
-                "monthly_surplus": monthly_surplus,
-                "savings_rate": savings_rate,
-                "investment_amount": investment_amount,
-                "has_investments": self._yes_no(has_investments),
-                "technology_comfort": round(max(1.0, min(5.0, 6 - (age / 16.0))), 1),
-                "money_management_approach": np.random.choice(self.money_approach),
-                "decision_making_style": np.random.choice(self.decision_style),
-                "goal_setting_behavior": np.random.choice(self.goal_style),
-                "preferred_communication": np.random.choice(self.communication_pref),
-                "information_processing": np.random.choice(self.info_processing),
-                "user_archetype": archetype,
-                "debt_to_income": debt_to_income
-            }
-            records.append(rec)
-
-        df = pd.DataFrame.from_records(records)
-
-        # final safety checks: ensure numeric columns are ints and no negative values
-        int_cols = [
-            'user_id','age','monthly_income','dependents','years_experience',
-            'monthly_expenses','food_expense','groceries_expense','education_expense',
-            'subscriptions_expense','fuel_expense','transportation_expense','utilities_expense',
-            'entertainment_expense','shopping_expense','healthcare_expense','personal_care_expense',
-            'miscellaneous_expense','monthly_surplus','investment_amount'
-        ]
-        for c in int_cols:
-            if c in df.columns:
-                df[c] = df[c].fillna(0).astype(int)
-                df[c] = df[c].clip(lower=0)
+        # Users are independent: shards, each on its own spawned seed
+        parts = run_chunks(self._generate_shard, chunk_bounds(self.num_users, MIN_SHARD_USERS), self.seed)
+        df = pd.concat(parts, ignore_index=True)
 
         # Save
-        df.to_csv(self.save_path, index=False)
+        if self.save_format == "parquet":
+            # int32 / categorical columns are stored as-is (categoricals as dictionary-encoded pages)
+            df.to_parquet(self.save_path, engine="pyarrow", compression="zstd", index=False)
+        else:
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), self.save_path)
         print(f"✅ Generated {len(df)} user profiles → {self.save_path}")
         print(f"Columns: {df.columns.tolist()}")
         return df
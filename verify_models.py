@@ -1,5 +1,11 @@
+import hashlib
+import json
 import os
-import pickle
+import platform
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+import joblib
 
 MODEL_DIR = "models"
 EXPECTED_MODELS = [
@@ -12,19 +18,75 @@ EXPECTED_MODELS = [
     "investment_cluster_kmeans.pkl",
     "seasonal_spending_kmeans.pkl"
 ]
+# fname -> mtime/size/sha256 and library versions of the last copy that loaded OK;
+# an unchanged file is not reloaded while the versions match
+MANIFEST_FILE = os.path.join(MODEL_DIR, ".verified.json")
 
-print("====== Verifying required FinBuddy model files ======")
-for fname in EXPECTED_MODELS:
+def library_versions():
+    # a model that loaded under one of these versions may not unpickle under another
+    versions = {"python": platform.python_version()}
+    for dist in ("numpy", "scikit-learn", "lightgbm", "joblib"):
+        try:
+            versions[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[dist] = None
+    return versions
+
+VERSIONS = library_versions()
+
+# compressed model files can't be memory-mapped; joblib then just loads them normally
+warnings.filterwarnings("ignore", message='mmap_mode "r" is not compatible with compressed file')
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def file_sha256(fpath):
+    h = hashlib.sha256()
+    with open(fpath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def check_model(fname, cached):
+    # returns (report line, manifest entry or None if the file didn't load)
     fpath = os.path.join(MODEL_DIR, fname)
-    label = fname.replace(".pkl", "")
     if not os.path.exists(fpath):
-        print(f"❌ {fname} — NOT FOUND")
-        continue
+        return f"❌ {fname} — NOT FOUND", None
+    st = os.stat(fpath)
+    if cached and cached.get("versions") != VERSIONS:
+        cached = None  # libraries changed since the last check: load it again
+    if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+        return f"✅ {fname} — Load OK (cached)", cached
+    sha256 = file_sha256(fpath)
+    entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": sha256, "versions": VERSIONS}
+    if cached and cached["sha256"] == sha256:
+        # touched or copied but byte-identical: hashing is far cheaper than unpickling
+        return f"✅ {fname} — Load OK (cached)", entry
     try:
-        with open(fpath, "rb") as f:
-            _ = pickle.load(f)
-        print(f"✅ {fname} — Load OK")
+        # models are written with joblib.dump; mmap_mode maps uncompressed numpy arrays
+        # read-only instead of copying them into memory
+        _ = joblib.load(fpath, mmap_mode="r")
     except Exception as e:
-        print(f"⚠️ {fname} — Unpickling error: {e.__class__.__name__}, {str(e)}")
+        return f"⚠️ {fname} — Unpickling error: {e.__class__.__name__}, {str(e)}", None
+    return f"✅ {fname} — Load OK", entry
+
+print("====== Verifying required FinBuddy model files ======")
+manifest = load_manifest()
+verified = {}
+# the checks are I/O bound, so they run side by side; results print in list order
+with ThreadPoolExecutor(max_workers=len(EXPECTED_MODELS)) as executor:
+    results = executor.map(lambda fname: check_model(fname, manifest.get(fname)), EXPECTED_MODELS)
+    for fname, (line, entry) in zip(EXPECTED_MODELS, results):
+        print(line)
+        if entry:
+            verified[fname] = entry
+
+if verified != manifest and os.path.isdir(MODEL_DIR):
+    with open(MANIFEST_FILE, "w") as f:
+        json.dump(verified, f, indent=2)
 
 print("====== Model verification complete ======")